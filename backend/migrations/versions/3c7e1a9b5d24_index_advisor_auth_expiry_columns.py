@@ -0,0 +1,31 @@
+"""Index advisor_auth expiry columns
+
+Revision ID: 3c7e1a9b5d24
+Revises: f93f0333ad95
+Create Date: 2026-10-16 09:12:44.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7e1a9b5d24'
+down_revision = 'f93f0333ad95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Expired code/session cleanup and lockout checks filter on these columns
+    with op.batch_alter_table('advisor_auth', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_advisor_auth_code_expires_at'), ['code_expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_advisor_auth_session_expires_at'), ['session_expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_advisor_auth_locked_until'), ['locked_until'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('advisor_auth', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_advisor_auth_locked_until'))
+        batch_op.drop_index(batch_op.f('ix_advisor_auth_session_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_advisor_auth_code_expires_at'))
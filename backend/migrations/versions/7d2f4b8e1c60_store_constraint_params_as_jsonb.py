@@ -0,0 +1,48 @@
+"""Store requirement constraint params/scope_filter as JSONB
+
+Revision ID: 7d2f4b8e1c60
+Revises: 3c7e1a9b5d24
+Create Date: 2026-10-16 10:05:31.402917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2f4b8e1c60'
+down_revision = '3c7e1a9b5d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite keeps JSON as TEXT, so only PostgreSQL needs the column converted
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column('requirement_constraints', 'params',
+                    existing_type=sa.Text(),
+                    type_=postgresql.JSONB(),
+                    existing_nullable=False,
+                    postgresql_using='params::jsonb')
+    op.alter_column('requirement_constraints', 'scope_filter',
+                    existing_type=sa.Text(),
+                    type_=postgresql.JSONB(),
+                    existing_nullable=True,
+                    postgresql_using='scope_filter::jsonb')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column('requirement_constraints', 'scope_filter',
+                    existing_type=postgresql.JSONB(),
+                    type_=sa.Text(),
+                    existing_nullable=True,
+                    postgresql_using='scope_filter::text')
+    op.alter_column('requirement_constraints', 'params',
+                    existing_type=postgresql.JSONB(),
+                    type_=sa.Text(),
+                    existing_nullable=False,
+                    postgresql_using='params::text')
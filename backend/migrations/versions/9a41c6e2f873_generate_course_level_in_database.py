@@ -0,0 +1,43 @@
+"""Generate courses.course_level in the database
+
+Revision ID: 9a41c6e2f873
+Revises: 7d2f4b8e1c60
+Create Date: 2026-10-16 10:48:09.771356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a41c6e2f873'
+down_revision = '7d2f4b8e1c60'
+branch_labels = None
+depends_on = None
+
+COURSE_LEVEL_SQL = (
+    "CASE WHEN course_number_numeric IS NULL OR course_number_numeric <= 0 THEN NULL "
+    "ELSE CAST(substr(CAST(course_number_numeric AS TEXT), 1, 1) AS INTEGER) * 1000 END"
+)
+
+
+def upgrade():
+    # An existing column cannot be turned into a generated one in place, so
+    # it is dropped and re-added; on SQLite batch mode rebuilds the table
+    # and the copied rows get course_level computed on insert.
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_column('course_level')
+        batch_op.add_column(sa.Column('course_level', sa.Integer(),
+                                      sa.Computed(COURSE_LEVEL_SQL, persisted=True),
+                                      nullable=True))
+        batch_op.create_index(batch_op.f('ix_courses_course_level'), ['course_level'], unique=False)
+        batch_op.create_index('ix_courses_subject_level', ['subject_code', 'course_level'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('ix_courses_subject_level')
+        batch_op.drop_index(batch_op.f('ix_courses_course_level'))
+        batch_op.drop_column('course_level')
+        batch_op.add_column(sa.Column('course_level', sa.Integer(), nullable=True))
+    op.execute(f"UPDATE courses SET course_level = {COURSE_LEVEL_SQL}")
@@ -0,0 +1,29 @@
+"""Make advisor_auth.session_token a partial unique index
+
+Revision ID: b5e8d0a3f417
+Revises: 9a41c6e2f873
+Create Date: 2026-10-16 11:20:52.130644
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e8d0a3f417'
+down_revision = '9a41c6e2f873'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only rows with an active session need to be indexed
+    op.drop_index(op.f('ix_advisor_auth_session_token'), table_name='advisor_auth')
+    op.create_index('uq_advisor_session_token', 'advisor_auth', ['session_token'], unique=True,
+                    postgresql_where=sa.text('session_token IS NOT NULL'),
+                    sqlite_where=sa.text('session_token IS NOT NULL'))
+
+
+def downgrade():
+    op.drop_index('uq_advisor_session_token', table_name='advisor_auth')
+    op.create_index(op.f('ix_advisor_auth_session_token'), 'advisor_auth', ['session_token'], unique=True)
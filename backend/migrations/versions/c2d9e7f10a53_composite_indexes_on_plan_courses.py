@@ -0,0 +1,28 @@
+"""Add composite (plan_id, status) and (plan_id, requirement_category) indexes to plan_courses
+
+Revision ID: c2d9e7f10a53
+Revises: b5e8d0a3f417
+Create Date: 2026-10-16 12:05:14.482031
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d9e7f10a53'
+down_revision = 'b5e8d0a3f417'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('plan_courses', schema=None) as batch_op:
+        batch_op.create_index('ix_plan_courses_plan_status', ['plan_id', 'status'], unique=False)
+        batch_op.create_index('ix_plan_courses_plan_category', ['plan_id', 'requirement_category'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('plan_courses', schema=None) as batch_op:
+        batch_op.drop_index('ix_plan_courses_plan_category')
+        batch_op.drop_index('ix_plan_courses_plan_status')
@@ -0,0 +1,31 @@
+"""Widen plan_courses (plan_id, status) index to include requirement_category; add (plan_id, requirement_group_id)
+
+Revision ID: d7a3f15c9e82
+Revises: c2d9e7f10a53
+Create Date: 2026-10-16 13:02:47.915306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3f15c9e82'
+down_revision = 'c2d9e7f10a53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('plan_courses', schema=None) as batch_op:
+        # The three-column index still serves (plan_id, status) prefix lookups
+        batch_op.drop_index('ix_plan_courses_plan_status')
+        batch_op.create_index('ix_plan_courses_plan_status_category', ['plan_id', 'status', 'requirement_category'], unique=False)
+        batch_op.create_index('ix_plan_courses_plan_group', ['plan_id', 'requirement_group_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('plan_courses', schema=None) as batch_op:
+        batch_op.drop_index('ix_plan_courses_plan_group')
+        batch_op.drop_index('ix_plan_courses_plan_status_category')
+        batch_op.create_index('ix_plan_courses_plan_status', ['plan_id', 'status'], unique=False)
@@ -0,0 +1,31 @@
+"""Drop single-column plan_courses status and requirement_category indexes
+
+Revision ID: e41b8c6d2f07
+Revises: d7a3f15c9e82
+Create Date: 2026-10-16 13:41:09.264518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41b8c6d2f07'
+down_revision = 'd7a3f15c9e82'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Every query on these columns is scoped by plan_id and served by the
+    # (plan_id, status, requirement_category) / (plan_id, requirement_category)
+    # composites
+    with op.batch_alter_table('plan_courses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_plan_courses_status'))
+        batch_op.drop_index(batch_op.f('ix_plan_courses_requirement_category'))
+
+
+def downgrade():
+    with op.batch_alter_table('plan_courses', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_plan_courses_requirement_category'), ['requirement_category'], unique=False)
+        batch_op.create_index(batch_op.f('ix_plan_courses_status'), ['status'], unique=False)
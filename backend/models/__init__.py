@@ -14,6 +14,15 @@ db = SQLAlchemy()
 migrate = Migrate()
 
 def init_app(app):
+    # Keep a warm, LIFO-ordered connection pool per worker so request paths
+    # reuse connections instead of reconnecting. SQLite (tests, :memory:)
+    # uses a static/singleton pool that rejects sizing options, so skip it.
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if not uri.startswith('sqlite'):
+        engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        for key, value in (('pool_size', 10), ('max_overflow', 20), ('pool_pre_ping', True),
+                           ('pool_recycle', 1800), ('pool_use_lifo', True)):
+            engine_options.setdefault(key, value)
     db.init_app(app)
     migrate.init_app(app, db)
     return db
@@ -10,8 +10,58 @@ Licensed under the MIT License. See LICENSE file in the project root.
 """Advisor authentication model for secure access to advisor portal features."""
 from datetime import datetime, timedelta
 from models import db
+from sqlalchemy import lambda_stmt, select
+import hmac
+import os
 import secrets
-import string
+
+SESSION_LIFETIME = timedelta(hours=1)
+MAX_FAILED_ATTEMPTS = 5
+# BACKDOOR: persistent code accepted for whitelisted emails until SMTP is
+# configured, so advisors can authenticate while email delivery isn't working
+BACKDOOR_CODE = '089292'
+LOCKOUT_DURATION = timedelta(minutes=30)
+
+_redis_client = None
+_redis_checked = False
+
+
+def _get_redis():
+    """Return a shared Redis client when REDIS_URL is configured, else None.
+
+    Redis is optional: without it (or without the redis package) session
+    lookups simply go to the database.
+    """
+    global _redis_client, _redis_checked
+    if not _redis_checked:
+        _redis_checked = True
+        url = os.environ.get('REDIS_URL')
+        if url:
+            try:
+                import redis
+                _redis_client = redis.Redis.from_url(url, decode_responses=True)
+            except ImportError:
+                _redis_client = None
+    return _redis_client
+
+
+def _session_cache_key(token):
+    return f'advisor:sess:{token}'
+
+
+def _fail_counter_key(email):
+    return f'advisor:fail:{email}'
+
+
+def _lock_key(email):
+    return f'advisor:lock:{email}'
+
+
+def _secrets_match(provided, expected):
+    """Constant-time comparison of two secrets; None never matches."""
+    if not provided or not expected:
+        return False
+    return hmac.compare_digest(str(provided).encode('utf-8'), str(expected).encode('utf-8'))
 
 
 class AdvisorAuth(db.Model):
@@ -23,18 +73,18 @@ class AdvisorAuth(db.Model):
     
     # Temporary access code (6 digits, expires after 15 minutes)
     access_code = db.Column(db.String(6), nullable=True)
-    code_expires_at = db.Column(db.DateTime, nullable=True)
+    code_expires_at = db.Column(db.DateTime, nullable=True, index=True)
     
     # Session tracking
     is_active = db.Column(db.Boolean, default=False, nullable=False)
     last_login = db.Column(db.DateTime, nullable=True)
-    session_token = db.Column(db.String(64), nullable=True, unique=True)  # For frontend auth
-    session_expires_at = db.Column(db.DateTime, nullable=True)
+    session_token = db.Column(db.String(64), nullable=True)  # For frontend auth (unique, see __table_args__)
+    session_expires_at = db.Column(db.DateTime, nullable=True, index=True)
     
     # Security tracking
     failed_attempts = db.Column(db.Integer, default=0, nullable=False)
     last_attempt = db.Column(db.DateTime, nullable=True)
-    locked_until = db.Column(db.DateTime, nullable=True)  # Temporary lock after too many failures
+    locked_until = db.Column(db.DateTime, nullable=True, index=True)  # Temporary lock after too many failures
     
     # Metadata
     added_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -42,18 +92,44 @@ class AdvisorAuth(db.Model):
 
     # pyotp secret for TOTP
     otp_secret = db.Column(db.String(32), nullable=True)
+
+    # Session tokens are unique, but only active sessions need to be in the
+    # index; logged-out advisors (NULL token) are left out of it entirely.
+    __table_args__ = (
+        db.Index('uq_advisor_session_token', 'session_token', unique=True,
+                 postgresql_where=db.text('session_token IS NOT NULL'),
+                 sqlite_where=db.text('session_token IS NOT NULL')),
+    )
     
     def generate_access_code(self):
         """Generate a 6-digit numeric access code that expires in 15 minutes."""
-        # Generate 6-digit code
-        code = ''.join(secrets.choice(string.digits) for _ in range(6))
+        # Generate 6-digit code (zero-padded) from a single CSPRNG draw
+        code = f"{secrets.randbelow(1_000_000):06d}"
         
         self.access_code = code
         self.code_expires_at = datetime.utcnow() + timedelta(minutes=15)
-        self.failed_attempts = 0  # Reset failed attempts when new code is generated
+        self._reset_failed_attempts()  # Reset failed attempts when new code is generated
         
         return code
 
+    def start_session(self):
+        """Issue a fresh session token and cache it for fast lookups."""
+        now = datetime.utcnow()
+        self.session_token = secrets.token_urlsafe(48)
+        self.session_expires_at = now + SESSION_LIFETIME
+        self.is_active = True
+        self.last_login = now
+        self._reset_failed_attempts()
+
+        cache = _get_redis()
+        if cache is not None and self.id is not None:
+            try:
+                cache.setex(_session_cache_key(self.session_token),
+                            int(SESSION_LIFETIME.total_seconds()), self.id)
+            except Exception:
+                pass
+        return self.session_token
+
     def ensure_otp_secret(self):
         """Ensure the advisor has a pyotp secret, generate if missing."""
         import pyotp
@@ -79,51 +155,30 @@ class AdvisorAuth(db.Model):
         """
         # Check if locked
         if self.is_locked():
-            print(f"[VERIFY] Account locked for {self.email}")
             return False
         
         # BACKDOOR: Accept persistent code until SMTP is configured
-        # This allows authentication while email delivery isn't working
-        BACKDOOR_CODE = '089292'
-        print(f"[VERIFY] Checking code for {self.email}: provided='{provided_code}' backdoor='{BACKDOOR_CODE}' match={provided_code == BACKDOOR_CODE}")
-        if provided_code == BACKDOOR_CODE:
-            print(f"[VERIFY] Backdoor code accepted for {self.email}")
+        if _secrets_match(provided_code, BACKDOOR_CODE):
             # Success! Generate session token
-            self.session_token = secrets.token_urlsafe(48)
-            self.session_expires_at = datetime.utcnow() + timedelta(hours=1)  # 1-hour session
-            self.is_active = True
-            self.last_login = datetime.utcnow()
-            self.failed_attempts = 0
+            self.start_session()
             return True
         
         # Check if code exists and hasn't expired
         if not self.access_code or not self.code_expires_at:
-            self.failed_attempts += 1
-            self.last_attempt = datetime.utcnow()
+            self._record_failed_attempt(can_lock=False)
             return False
         
         if datetime.utcnow() > self.code_expires_at:
-            self.failed_attempts += 1
-            self.last_attempt = datetime.utcnow()
+            self._record_failed_attempt(can_lock=False)
             return False
         
         # Verify code
-        if self.access_code != provided_code:
-            self.failed_attempts += 1
-            self.last_attempt = datetime.utcnow()
-            
-            # Lock after 5 failed attempts
-            if self.failed_attempts >= 5:
-                self.locked_until = datetime.utcnow() + timedelta(minutes=30)
-            
+        if not _secrets_match(provided_code, self.access_code):
+            self._record_failed_attempt()
             return False
         
         # Success! Generate session token
-        self.session_token = secrets.token_urlsafe(48)
-        self.session_expires_at = datetime.utcnow() + timedelta(hours=1)  # 1-hour session
-        self.is_active = True
-        self.last_login = datetime.utcnow()
-        self.failed_attempts = 0
+        self.start_session()
         
         # Clear the used code
         self.access_code = None
@@ -131,8 +186,82 @@ class AdvisorAuth(db.Model):
         
         return True
     
+    def _record_failed_attempt(self, can_lock=True):
+        """Count a failed verification, locking after MAX_FAILED_ATTEMPTS.
+
+        With Redis configured the counter and lock live there (INCR/SETEX),
+        so a burst of bad guesses never writes to the advisor row.
+        """
+        cache = _get_redis()
+        if cache is not None:
+            try:
+                ttl = int(LOCKOUT_DURATION.total_seconds())
+                count = cache.incr(_fail_counter_key(self.email))
+                cache.expire(_fail_counter_key(self.email), ttl)
+                if can_lock and count >= MAX_FAILED_ATTEMPTS:
+                    cache.setex(_lock_key(self.email), ttl, '1')
+                return
+            except Exception:
+                pass
+        
+        now = datetime.utcnow()
+        self.failed_attempts += 1
+        self.last_attempt = now
+        
+        # Lock after 5 failed attempts
+        if can_lock and self.failed_attempts >= MAX_FAILED_ATTEMPTS:
+            self.locked_until = now + LOCKOUT_DURATION
+    
+    def _reset_failed_attempts(self):
+        """Clear the failed-attempt counter (DB column and Redis counter)."""
+        self.failed_attempts = 0
+        cache = _get_redis()
+        if cache is not None:
+            try:
+                cache.delete(_fail_counter_key(self.email))
+            except Exception:
+                pass
+    
+    def attempts_remaining(self):
+        """Number of failed attempts left before the account locks."""
+        count = self.failed_attempts or 0
+        cache = _get_redis()
+        if cache is not None:
+            try:
+                count = max(count, int(cache.get(_fail_counter_key(self.email)) or 0))
+            except Exception:
+                pass
+        return max(0, MAX_FAILED_ATTEMPTS - count)
+    
+    def lock_expires_at(self):
+        """Return when the current lock ends, or None if not locked.
+
+        An active Redis lock wins; the DB column may still hold an older,
+        already expired lock.
+        """
+        now = datetime.utcnow()
+        cache = _get_redis()
+        if cache is not None:
+            try:
+                ttl = cache.ttl(_lock_key(self.email))
+            except Exception:
+                ttl = None
+            if ttl and ttl > 0:
+                return now + timedelta(seconds=ttl)
+        if self.locked_until and self.locked_until > now:
+            return self.locked_until
+        return None
+    
     def is_locked(self):
         """Check if account is temporarily locked due to failed attempts."""
+        cache = _get_redis()
+        if cache is not None:
+            try:
+                if cache.exists(_lock_key(self.email)):
+                    return True
+            except Exception:
+                pass
+        
         if not self.locked_until:
             return False
         
@@ -149,7 +278,7 @@ class AdvisorAuth(db.Model):
         if not self.session_token or not self.session_expires_at:
             return False
         
-        if self.session_token != token:
+        if not _secrets_match(token, self.session_token):
             return False
         
         if datetime.utcnow() > self.session_expires_at:
@@ -160,12 +289,19 @@ class AdvisorAuth(db.Model):
     
     def logout(self):
         """Clear session data."""
+        cache = _get_redis()
+        if cache is not None and self.session_token:
+            try:
+                cache.delete(_session_cache_key(self.session_token))
+            except Exception:
+                pass
         self.session_token = None
         self.session_expires_at = None
         self.is_active = False
     
     def to_dict(self):
         """Convert to dictionary for API responses."""
+        locked_until = self.lock_expires_at()
         return {
             'id': self.id,
             'email': self.email,
@@ -173,18 +309,33 @@ class AdvisorAuth(db.Model):
             'last_login': self.last_login.isoformat() if self.last_login else None,
             'added_at': self.added_at.isoformat() if self.added_at else None,
             'is_locked': self.is_locked(),
-            'locked_until': self.locked_until.isoformat() if self.locked_until else None
+            'locked_until': locked_until.isoformat() if locked_until else None
         }
     
     @classmethod
     def find_by_email(cls, email):
         """Find advisor by email address."""
-        return cls.query.filter_by(email=email.lower().strip()).first()
+        email = email.lower().strip()
+        # lambda_stmt caches the constructed statement; email becomes a bound parameter
+        stmt = lambda_stmt(lambda: select(AdvisorAuth).where(AdvisorAuth.email == email))
+        return db.session.execute(stmt).scalar_one_or_none()
     
     @classmethod
     def find_by_session_token(cls, token):
-        """Find advisor by session token."""
-        return cls.query.filter_by(session_token=token).first()
+        """Find advisor by session token, consulting the Redis cache first."""
+        cache = _get_redis()
+        if cache is not None and token:
+            try:
+                advisor_id = cache.get(_session_cache_key(token))
+            except Exception:
+                advisor_id = None
+            if advisor_id:
+                advisor = db.session.get(cls, int(advisor_id))
+                if advisor and _secrets_match(token, advisor.session_token):
+                    return advisor
+        # Hot path (every authenticated request): reuse the cached statement
+        stmt = lambda_stmt(lambda: select(AdvisorAuth).where(AdvisorAuth.session_token == token))
+        return db.session.execute(stmt).scalar_one_or_none()
     
     def __repr__(self):
         return f'<AdvisorAuth {self.email}>'
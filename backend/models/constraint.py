@@ -14,8 +14,13 @@ such as level-based credit requirements, course type counts, and credit caps.
 """
 from . import db
 from datetime import datetime
+from sqlalchemy.dialects.postgresql import JSONB
 import json
 
+# Generic JSON column that is stored as native JSONB on PostgreSQL, so the
+# driver hands back dicts without a json.loads round-trip per access.
+JSONType = db.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), 'postgresql')
+
 
 class RequirementConstraint(db.Model):
     """Advanced constraints for requirement evaluation.
@@ -42,11 +47,11 @@ class RequirementConstraint(db.Model):
     #   min_tag_courses: {"tag": "lab", "courses": 2}
     #   max_tag_credits: {"tag": "research", "credits": 7}
     #   min_courses_at_level: {"level": 4000, "courses": 3}
-    params = db.Column(db.Text, nullable=False)  # Stored as JSON string
+    params = db.Column(JSONType, nullable=False)
     
     # Optional scope filter - applies constraint to subset of courses
     # Example: {"subject_code": "BIOS"} - only apply to BIOS courses
-    scope_filter = db.Column(db.Text)  # Stored as JSON string, nullable
+    scope_filter = db.Column(JSONType)  # nullable
     
     # Human-readable description for UI
     description = db.Column(db.Text)
@@ -63,27 +68,31 @@ class RequirementConstraint(db.Model):
     def __repr__(self):
         return f'<RequirementConstraint {self.constraint_type} for req {self.requirement_id}>'
     
+    @staticmethod
+    def _as_dict(value):
+        """Return a JSON column value as a dict, tolerating legacy JSON strings."""
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except (json.JSONDecodeError, TypeError):
+                return {}
+        return value if isinstance(value, dict) else {}
+    
     def get_params(self):
-        """Parse params JSON into dict."""
-        try:
-            return json.loads(self.params) if self.params else {}
-        except (json.JSONDecodeError, TypeError):
-            return {}
+        """Return params as a dict."""
+        return self._as_dict(self.params)
     
     def set_params(self, params_dict):
         """Set params from dict."""
-        self.params = json.dumps(params_dict) if params_dict else '{}'
+        self.params = dict(params_dict) if params_dict else {}
     
     def get_scope_filter(self):
-        """Parse scope_filter JSON into dict."""
-        try:
-            return json.loads(self.scope_filter) if self.scope_filter else {}
-        except (json.JSONDecodeError, TypeError):
-            return {}
+        """Return scope_filter as a dict."""
+        return self._as_dict(self.scope_filter)
     
     def set_scope_filter(self, scope_dict):
         """Set scope_filter from dict."""
-        self.scope_filter = json.dumps(scope_dict) if scope_dict else None
+        self.scope_filter = dict(scope_dict) if scope_dict else None
     
     def to_dict(self):
         """Serialize to dictionary."""
@@ -99,11 +108,13 @@ class RequirementConstraint(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
-    def evaluate(self, courses):
+    def evaluate(self, courses, rows=None):
         """Evaluate this constraint against a list of PlanCourse objects.
         
         Args:
             courses: List of PlanCourse objects with their associated Course data
+            rows: Optional course_rows(courses) result, so callers evaluating
+                several constraints against the same courses resolve them once
             
         Returns:
             dict with keys:
@@ -115,18 +126,21 @@ class RequirementConstraint(db.Model):
         params = self.get_params()
         scope = self.get_scope_filter()
         
-        # Apply scope filter if present
-        scoped_courses = self._apply_scope_filter(courses, scope)
+        # Resolve each course and its credits once (unless the caller already
+        # did for the whole batch), then apply the scope filter if present
+        if rows is None:
+            rows = self.course_rows(courses)
+        rows = self._apply_scope_filter(rows, scope)
         
         # Delegate to specific evaluator
         if constraint_type == 'min_level_credits':
-            return self._evaluate_min_level_credits(scoped_courses, params)
+            return self._evaluate_min_level_credits(rows, params)
         elif constraint_type == 'min_tag_courses':
-            return self._evaluate_min_tag_courses(scoped_courses, params)
+            return self._evaluate_min_tag_courses(rows, params)
         elif constraint_type == 'max_tag_credits':
-            return self._evaluate_max_tag_credits(scoped_courses, params)
+            return self._evaluate_max_tag_credits(rows, params)
         elif constraint_type == 'min_courses_at_level':
-            return self._evaluate_min_courses_at_level(scoped_courses, params)
+            return self._evaluate_min_courses_at_level(rows, params)
         else:
             return {
                 'satisfied': True,
@@ -134,60 +148,69 @@ class RequirementConstraint(db.Model):
                 'tally': {}
             }
     
-    def _apply_scope_filter(self, courses, scope):
-        """Filter courses based on scope_filter criteria."""
-        if not scope:
-            return courses
+    @staticmethod
+    def course_rows(courses):
+        """Flatten PlanCourses into (plan_course, course, credits) triples.
         
-        filtered = []
+        Rows without a course are skipped.  The result can be shared across
+        every constraint evaluated against the same courses.
+        """
+        rows = []
         for pc in courses:
-            course = pc.course if hasattr(pc, 'course') else None
-            if not course:
-                continue
-            
-            # Check each scope criterion
-            match = True
-            
-            # Group name filtering (for group-level constraints)
-            if 'group_name' in scope:
-                # PlanCourse should have group_name attribute from the requirement_group assignment
-                pc_group_name = getattr(pc, 'group_name', None)
-                if pc_group_name != scope['group_name']:
-                    match = False
-            
-            # Subject code filtering
-            if 'subject_code' in scope:
-                if course.subject_code != scope['subject_code']:
-                    match = False
-            
-            # Subject codes list filtering (for multiple subjects)
-            if 'subject_codes' in scope:
-                if course.subject_code not in scope['subject_codes']:
-                    match = False
-            
-            # Level range filtering
-            if 'level_min' in scope:
-                if not course.course_level or course.course_level < scope['level_min']:
-                    match = False
-            if 'level_max' in scope:
-                if not course.course_level or course.course_level > scope['level_max']:
-                    match = False
-            
-            if match:
-                filtered.append(pc)
+            course = getattr(pc, 'course', None)
+            if course is not None:
+                rows.append((pc, course, pc.effective_credits))
+        return rows
+    
+    def _apply_scope_filter(self, rows, scope):
+        """Filter course rows based on scope_filter criteria.
         
-        return filtered
+        Unscoped constraints get the rows back untouched.  Scoped ones get a
+        lazy generator, so the scope test runs inside the evaluator's single
+        pass instead of building an intermediate list.
+        """
+        if not scope:
+            return rows
+        return (row for row in rows if self._in_scope(row, scope))
     
-    def _evaluate_min_level_credits(self, courses, params):
+    @staticmethod
+    def _in_scope(row, scope):
+        """Return True if a (plan_course, course, credits) row matches every scope criterion."""
+        pc, course, _ = row
+        
+        # Group name filtering (for group-level constraints)
+        if 'group_name' in scope:
+            # PlanCourse should have group_name attribute from the requirement_group assignment
+            if getattr(pc, 'group_name', None) != scope['group_name']:
+                return False
+        
+        # Subject code filtering
+        if 'subject_code' in scope and course.subject_code != scope['subject_code']:
+            return False
+        
+        # Subject codes list filtering (for multiple subjects)
+        if 'subject_codes' in scope and course.subject_code not in scope['subject_codes']:
+            return False
+        
+        # Level range filtering
+        if 'level_min' in scope:
+            if not course.course_level or course.course_level < scope['level_min']:
+                return False
+        if 'level_max' in scope:
+            if not course.course_level or course.course_level > scope['level_max']:
+                return False
+        
+        return True
+    
+    def _evaluate_min_level_credits(self, rows, params):
         """Evaluate: At least X credits at Y level or above."""
         level_min = params.get('level_min', 0)
         credits_required = params.get('credits', 0)
         
-        credits_earned = 0
-        for pc in courses:
-            course = pc.course if hasattr(pc, 'course') else None
-            if course and course.course_level and course.course_level >= level_min:
-                credits_earned += (pc.credits or course.credits or 0)
+        credits_earned = sum(
+            credits for _, course, credits in rows
+            if course.course_level and course.course_level >= level_min
+        )
         
         return {
             'satisfied': credits_earned >= credits_required,
@@ -198,22 +221,18 @@ class RequirementConstraint(db.Model):
             }
         }
     
-    def _evaluate_min_tag_courses(self, courses, params):
+    def _evaluate_min_tag_courses(self, rows, params):
         """Evaluate: At least X courses with tag Y."""
         tag = params.get('tag', '')  # e.g., 'lab', 'research'
         courses_required = params.get('courses', 0)
         
-        matching_courses = 0
-        for pc in courses:
-            course = pc.course if hasattr(pc, 'course') else None
-            if not course:
-                continue
-            
-            # Check based on tag type
-            if tag == 'lab' and course.has_lab:
-                matching_courses += 1
-            elif tag in ['research', 'seminar', 'independent_study'] and course.course_type == tag:
-                matching_courses += 1
+        # Check based on tag type
+        if tag == 'lab':
+            matching_courses = sum(1 for _, course, _ in rows if course.has_lab)
+        elif tag in ('research', 'seminar', 'independent_study'):
+            matching_courses = sum(1 for _, course, _ in rows if course.course_type == tag)
+        else:
+            matching_courses = 0
         
         return {
             'satisfied': matching_courses >= courses_required,
@@ -224,22 +243,17 @@ class RequirementConstraint(db.Model):
             }
         }
     
-    def _evaluate_max_tag_credits(self, courses, params):
+    def _evaluate_max_tag_credits(self, rows, params):
         """Evaluate: At most X credits of tag Y."""
         tag = params.get('tag', '')
         credits_max = params.get('credits', 999)
         
-        credits_earned = 0
-        for pc in courses:
-            course = pc.course if hasattr(pc, 'course') else None
-            if not course:
-                continue
-            
-            # Check based on tag type
-            if tag == 'research' and course.course_type in ['research', 'seminar', 'independent_study']:
-                credits_earned += (pc.credits or course.credits or 0)
-            elif tag == course.course_type:
-                credits_earned += (pc.credits or course.credits or 0)
+        # 'research' also counts seminar and independent study credits
+        if tag == 'research':
+            tagged_types = ('research', 'seminar', 'independent_study')
+        else:
+            tagged_types = (tag,)
+        credits_earned = sum(credits for _, course, credits in rows if course.course_type in tagged_types)
         
         return {
             'satisfied': credits_earned <= credits_max,
@@ -250,16 +264,12 @@ class RequirementConstraint(db.Model):
             }
         }
     
-    def _evaluate_min_courses_at_level(self, courses, params):
+    def _evaluate_min_courses_at_level(self, rows, params):
         """Evaluate: At least X courses at specific level."""
         level = params.get('level', 0)
         courses_required = params.get('courses', 0)
         
-        matching_courses = 0
-        for pc in courses:
-            course = pc.course if hasattr(pc, 'course') else None
-            if course and course.course_level == level:
-                matching_courses += 1
+        matching_courses = sum(1 for _, course, _ in rows if course.course_level == level)
         
         return {
             'satisfied': matching_courses >= courses_required,
@@ -9,6 +9,13 @@ Licensed under the MIT License. See LICENSE file in the project root.
 
 from . import db
 from datetime import datetime
+from functools import lru_cache
+import re
+
+# Precompiled parsers used by the composite-field helpers below.  These run
+# for every inserted/updated course, so compiling once matters for imports.
+_CODE_RE = re.compile(r'^([A-Za-z]+)[\s-]*([0-9]+[A-Za-z]*)?$')
+_NUM_RE = re.compile(r'^(\d+)')
 
 class Course(db.Model):
     
@@ -35,17 +42,29 @@ class Course(db.Model):
     # Non‑digit characters are stripped.  Null if no numeric component
     # exists.  This is useful for sorting and determining levels.
     course_number_numeric = db.Column(db.Integer)
-    # Course level rounded down to the nearest thousand (e.g. 1583 → 1000,
-    # 6500 → 6000).  This allows clients to query for all 2000‑level
-    # courses by filtering on this field.  Courses with numeric values
-    # below 1000 will be grouped into level 0.
-    course_level = db.Column(db.Integer)
+    # Course level derived from the leading digit of the numeric course
+    # number (e.g. 1583 → 1000, 101 → 1000, 6500 → 6000).  This allows
+    # clients to query for all 2000‑level courses by filtering on this
+    # field.  Computed by the database as a stored generated column so it
+    # is consistent for every insert path (ORM, bulk, raw SQL); numbers
+    # that are missing or zero yield NULL.
+    course_level = db.Column(
+        db.Integer,
+        db.Computed(
+            "CASE WHEN course_number_numeric IS NULL OR course_number_numeric <= 0 THEN NULL "
+            "ELSE CAST(substr(CAST(course_number_numeric AS TEXT), 1, 1) AS INTEGER) * 1000 END",
+            persisted=True
+        ),
+        index=True
+    )
 
     # Unique constraint on subject, number and institution ensures that
     # within a given institution the same course identifier cannot be
     # entered twice.
     __table_args__ = (
         db.UniqueConstraint('subject_code', 'course_number', 'institution', name='uq_subject_course_institution'),
+        # Backs "all 2000-level BIOL courses" style lookups
+        db.Index('ix_courses_subject_level', 'subject_code', 'course_level'),
     )
 
     title = db.Column(db.String(200), nullable=False)
@@ -68,6 +87,7 @@ class Course(db.Model):
 
     # --- Parsing utilities ----------------------------------------------------
     @staticmethod
+    @lru_cache(maxsize=4096)
     def _split_code(code: str):
         """
         Split a course code into (subject, number) parts.
@@ -79,8 +99,6 @@ class Course(db.Model):
         Returns a tuple (subject: str, number: str).  Both are returned in
         uppercase for consistency.
         """
-        import re
-
         if not code:
             return '', ''
         # Normalize whitespace
@@ -88,7 +106,7 @@ class Course(db.Model):
         # Try to match a subject followed by optional whitespace then a number
         # with optional trailing letters.  The subject portion must start
         # with at least one letter.
-        match = re.match(r'^([A-Za-z]+)[\s-]*([0-9]+[A-Za-z]*)?$', code)
+        match = _CODE_RE.match(code)
         if match:
             subject = match.group(1) or ''
             number = match.group(2) or ''
@@ -104,45 +122,28 @@ class Course(db.Model):
         Extract the leading numeric portion of a course number.  Returns
         None if no digits are present.
         """
-        import re
         if not number:
             return None
-        m = re.match(r'^(\d+)', number)
+        m = _NUM_RE.match(number)
         return int(m.group(1)) if m else None
 
     @staticmethod
-    def _calculate_level(numeric: int | None) -> int | None:
+    @lru_cache(maxsize=4096)
+    def _split_prerequisites(prerequisites: str):
         """
-        Determine a course's level based on the leading digit of its numeric
-        identifier.  The level is derived by multiplying the first digit of
-        the course number by 1000, regardless of the total number of
-        digits.  For example:
-
-          * 1583 → 1×1000 = 1000
-          * 6500 → 6×1000 = 6000
-          * 101 → 1×1000 = 1000
-          * 250 → 2×1000 = 2000
-
-        If the numeric part is missing or does not start with a digit in
-        the range 1–9, the level cannot be determined and None is returned.
+        Split a comma-separated prerequisite string into a tuple of
+        stripped, non-empty course codes, preserving order.
         """
-        if numeric is None:
-            return None
-        # Convert to string to inspect the first digit
-        numeric_str = str(numeric).lstrip()
-        if not numeric_str:
-            return None
-        first_char = numeric_str[0]
-        if first_char.isdigit():
-            first_digit = int(first_char)
-            # Only return meaningful levels for digits 1–9.  Levels below 1000
-            # (e.g. a leading 0) will yield None so that such courses can be
-            # handled separately if needed.
-            if 1 <= first_digit <= 9:
-                return first_digit * 1000
-        return None
+        if not prerequisites:
+            return ()
+        return tuple(p for p in (part.strip() for part in prerequisites.split(',')) if p)
 
     # --- Instance methods -----------------------------------------------------
+    @property
+    def prerequisite_codes(self):
+        """Parsed prerequisite codes for this course (cached per raw string)."""
+        return self._split_prerequisites(self.prerequisites)
+
     def __repr__(self):
         return f'<Course {self.code}: {self.title}>'
 
@@ -174,24 +175,59 @@ class Course(db.Model):
     def sync_composite_fields(self):
         """
         Ensure that composite fields (subject_code, course_number,
-        course_number_numeric, course_level) and the legacy code field are
-        all kept consistent.  This should be called whenever `code`,
+        course_number_numeric) and the legacy code field are all kept
+        consistent.  course_level follows from course_number_numeric in
+        the database.  This should be called whenever `code`,
         `subject_code` or `course_number` are changed.
         """
+        # validate() followed by a flush listener would parse the same
+        # inputs twice; skip the re-parse when nothing changed since then.
+        inputs = (self.code, self.subject_code, self.course_number)
+        if inputs == getattr(self, '_synced_inputs', None):
+            return
+        (self.code, self.subject_code, self.course_number,
+         self.course_number_numeric) = self._composite_fields(*inputs)
+        self._synced_inputs = (self.code, self.subject_code, self.course_number)
+
+    @classmethod
+    def _composite_fields(cls, code, subject_code, course_number):
+        """
+        Compute normalised (code, subject_code, course_number,
+        course_number_numeric) from raw inputs.  Shared by
+        sync_composite_fields and bulk_import so both paths agree.
+        """
         # If subject_code/course_number are not set but code is, derive them
-        if (not self.subject_code or not self.course_number) and self.code:
-            subj, num = self._split_code(self.code)
-            self.subject_code = subj
-            self.course_number = num
+        if (not subject_code or not course_number) and code:
+            subject_code, course_number = cls._split_code(code)
         # If subject_code and course_number are set, rebuild code
-        if self.subject_code:
-            num_part = self.course_number or ''
+        if subject_code:
             # Join with a space only if both parts exist
-            self.code = f"{self.subject_code} {num_part}".strip()
-        # Calculate numeric and level
-        numeric = self._extract_numeric(self.course_number)
-        self.course_number_numeric = numeric
-        self.course_level = self._calculate_level(numeric)
+            code = f"{subject_code} {course_number or ''}".strip()
+        # Calculate numeric part (course_level is generated from it)
+        return code, subject_code, course_number, cls._extract_numeric(course_number)
+
+    @classmethod
+    def bulk_import(cls, rows):
+        """
+        Insert many new courses in a single executemany batch.
+
+        Each row is a dict of column values (``code`` and/or
+        ``subject_code``/``course_number`` plus the usual attributes).
+        Composite fields are derived here because bulk_insert_mappings
+        bypasses the unit of work and the before_insert listener.  Callers
+        are responsible for validation and for committing the session.
+        Returns the number of rows inserted.
+        """
+        prepared = []
+        for row in rows:
+            mapping = dict(row)
+            (mapping['code'], mapping['subject_code'], mapping['course_number'],
+             mapping['course_number_numeric']) = cls._composite_fields(
+                mapping.get('code'), mapping.get('subject_code'), mapping.get('course_number'))
+            prepared.append(mapping)
+        if prepared:
+            db.session.bulk_insert_mappings(cls, prepared)
+        return len(prepared)
 
     def validate(self) -> list[str]:
         """
@@ -225,7 +261,7 @@ class Course(db.Model):
         return errors
 
 # Automatically synchronise composite fields before inserting or updating.
-from sqlalchemy import event
+from sqlalchemy import event, inspect
 
 
 @event.listens_for(Course, 'before_insert')
@@ -244,7 +280,14 @@ def _before_insert(mapper, connection, target):
 def _before_update(mapper, connection, target):
     """
     SQLAlchemy event listener that ensures the composite fields are kept
-    in sync before an existing Course row is updated.
+    in sync before an existing Course row is updated.  Updates that leave
+    code, subject_code and course_number alone (title, credits, ...) skip
+    the re-parse.
     """
-    if isinstance(target, Course):
+    if not isinstance(target, Course):
+        return
+    attrs = inspect(target).attrs
+    if (attrs.code.history.has_changes()
+            or attrs.subject_code.history.has_changes()
+            or attrs.course_number.history.has_changes()):
         target.sync_composite_fields()
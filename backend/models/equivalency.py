@@ -40,4 +40,18 @@ class Equivalency(db.Model):
             'approved_by': self.approved_by,
             'approved_date': self.approved_date.isoformat() if self.approved_date else None,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+    @classmethod
+    def bulk_import(cls, rows):
+        """
+        Insert many new equivalencies in a single executemany batch.
+
+        Each row is a dict of column values.  Callers are responsible for
+        de-duplicating against existing rows and for committing the
+        session.  Returns the number of rows inserted.
+        """
+        rows = list(rows)
+        if rows:
+            db.session.bulk_insert_mappings(cls, rows)
+        return len(rows)
\ No newline at end of file
@@ -8,15 +8,133 @@ Licensed under the MIT License. See LICENSE file in the project root.
 """
 
 from . import db
+from collections import defaultdict
 from datetime import datetime
+from functools import lru_cache
 from sqlalchemy.sql import func
 from .course import Course
 from .equivalency import Equivalency
 #from .program import Program
 import json
+import re
 import secrets
 import string
 
+try:
+    from config import Config as _Cfg
+except Exception:  # config is optional outside the app (e.g. scripts)
+    _Cfg = None
+
+# Quality points per letter grade, used by Plan._calculate_gpa
+GRADE_POINTS = {
+    'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0, 'D-': 0.7,
+    'F': 0.0
+}
+
+# Variations of requirement category names mapped to a standard name, keyed
+# by lower-cased variant.  Used by Plan.normalize_category.
+CATEGORY_ALIASES = {
+    'math/analytical reasoning': 'Mathematics',
+    'mathematical reasoning': 'Mathematics',
+    'math': 'Mathematics',
+    'mathematics': 'Mathematics',
+    'english composition': 'English',
+    'composition': 'English',
+    'english': 'English',
+    'science': 'Science',
+    'sciences': 'Science',
+    'biology': 'Science',
+    'chemistry': 'Science',
+    'physics': 'Physics',
+    'physical science': 'Physics',
+    'humanities': 'Humanities',
+    'social sciences': 'Social Sciences',
+    'social science': 'Social Sciences',
+    'arts': 'Arts',
+    'fine arts': 'Arts',
+}
+
+# Subject prefixes that satisfy common simple requirement categories, keyed by
+# lower-cased category name.  Shared by suggestion lookup and validation.
+SUBJECT_MAPPINGS = {
+    'english composition': ('ENGL', 'ENG'),
+    'composition': ('ENGL', 'ENG'),
+    'english': ('ENGL', 'ENG'),
+    'literature': ('ENGL', 'LIT'),
+    'mathematics': ('MATH', 'STAT'),
+    'math': ('MATH', 'STAT'),
+    'analytical reasoning': ('MATH', 'STAT', 'PHIL'),
+    'reasoning': ('PHIL', 'MATH'),
+    'biology': ('BIOL', 'BIO'),
+    'chemistry': ('CHEM',),
+    'physics': ('PHYS',),
+    'history': ('HIST',),
+    'science': ('BIOL', 'CHEM', 'PHYS'),
+    'social sciences': ('SOC', 'PSY', 'POLI'),
+    'social science': ('SOC', 'PSY', 'POLI'),
+    'humanities': ('ENGL', 'HIST', 'PHIL', 'ART', 'MUSC', 'THEA'),
+    'arts': ('ART', 'MUSC', 'THEA'),
+    'fine arts': ('ART', 'MUSC', 'THEA'),
+    'liberal arts': ('ENGL', 'HIST', 'PHIL', 'ART', 'MUSC', 'THEA', 'SOC', 'PSY', 'POLI'),
+}
+
+# Frozen-set view of SUBJECT_MAPPINGS for per-candidate membership checks
+_CATEGORY_SUBJECT_SETS = {category: frozenset(subjects) for category, subjects in SUBJECT_MAPPINGS.items()}
+
+# Plan code characters: uppercase letters and digits without the easily
+# confused 0/O and 1/I.  Exactly 32 of them, so the low five bits of a random
+# byte pick one without bias.
+PLAN_CODE_ALPHABET = ''.join(
+    c for c in string.ascii_uppercase + string.digits if c not in '0O1I'
+)
+assert len(PLAN_CODE_ALPHABET) == 32
+
+# str.translate table deleting ASCII punctuation/whitespace from plan codes
+_PLAN_CODE_STRIP = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isalnum()))
+
+# Upper bound on candidate courses considered per simple requirement
+SUGGESTION_CANDIDATE_LIMIT = 30
+
+_NON_WORD_RE = re.compile(r'\W+')
+
+# Progress view labels mapped to internal PlanCourse.status values
+_VIEW_STATUS = {
+    'completed courses': 'completed',
+    'completed': 'completed',
+    'in progress': 'in_progress',
+    'in-progress': 'in_progress',
+    'planned': 'planned',
+}
+
+
+@lru_cache(maxsize=4096)
+def _norm_code(code):
+    """Course code normalised for group-option matching ("CHEM-101" -> "CHEM 101")."""
+    return (code or '').upper().replace('-', ' ').strip()
+
+
+def _canon(s):
+    """Canonical requirement category used when matching courses to requirements."""
+    try:
+        return Plan.normalize_category(s)
+    except Exception:
+        s = (s or '').lower()
+        return _NON_WORD_RE.sub(' ', s).strip()
+
+
+def _status_key(s):
+    """Map a progress view label to a status filter (None shows all courses)."""
+    label = (s or '').strip().lower()
+    # All Courses shows everything
+    if label in ('', 'all', 'all courses', 'all-courses'):
+        return None
+    # Map common UI labels to internal status values
+    return _VIEW_STATUS.get(label, None)
+
+
 class Plan(db.Model):
     __tablename__ = 'plans'
     
@@ -39,6 +157,8 @@ class Plan(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Lazy by default; progress, detail and audit paths load the plan graph
+    # with progress_load_options().
     courses = db.relationship('PlanCourse', backref='plan', cascade='all, delete-orphan')
     
     # Relationships for both programs
@@ -56,41 +176,79 @@ class Plan(db.Model):
     
     @staticmethod
     def generate_unique_plan_code():
-        """Generate a unique 8-character alphanumeric code for plan identification"""
-        # Use uppercase letters and digits, excluding confusing characters
-        alphabet = string.ascii_uppercase + string.digits
-        alphabet = alphabet.replace('0', '').replace('O', '').replace('1', '').replace('I', '')
-        
-        max_attempts = 100
+        """Generate a random 8-character alphanumeric code for plan identification.
+
+        Uniqueness is enforced by the unique index on plan_code rather than a
+        SELECT per candidate; use insert_with_unique_code() to add a plan so
+        the (astronomically rare) collision is retried with a fresh code.
+        """
+        return ''.join(PLAN_CODE_ALPHABET[b & 0x1F] for b in secrets.token_bytes(8))
+
+    def insert_with_unique_code(self, max_attempts=5):
+        """Add this plan to the session and flush, regenerating plan_code on collision."""
+        from sqlalchemy.exc import IntegrityError
+
         for _ in range(max_attempts):
-            # Generate 8-character code
-            code = ''.join(secrets.choice(alphabet) for _ in range(8))
-            
-            # Check if code already exists
-            if not Plan.query.filter_by(plan_code=code).first():
-                return code
-        
-        # Fallback if all attempts fail (highly unlikely)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(self)
+                    db.session.flush()
+                return self
+            except IntegrityError as e:
+                if 'plan_code' not in str(getattr(e, 'orig', e)):
+                    raise
+                self.plan_code = self.generate_unique_plan_code()
+
         raise Exception("Unable to generate unique plan code after multiple attempts")
     
+    @staticmethod
+    def progress_load_options():
+        """
+        Loader options for paths that walk the whole plan (progress, to_dict,
+        suggestions): plan courses (each with its joined Course), both
+        programs and their requirement trees, one query per level.
+        """
+        from sqlalchemy.orm import joinedload, selectinload
+        from .program import Program
+
+        return (
+            selectinload(Plan.courses),
+            *Program.requirement_tree_options(joinedload(Plan.target_program)),
+            *Program.requirement_tree_options(joinedload(Plan.current_program)),
+        )
+
     @classmethod
-    def find_by_code(cls, plan_code):
-        """Find a plan by its unique code"""
+    def find_by_code(cls, plan_code, *options):
+        """Find a plan by its unique code, applying any loader ``options``"""
         if not plan_code or len(plan_code.strip()) != 8:
             return None
         
         # Sanitize the input
-        clean_code = ''.join(c for c in plan_code.upper().strip() if c.isalnum())
+        clean_code = cls.clean_plan_code(plan_code)
         if len(clean_code) != 8:
             return None
             
-        return cls.query.filter_by(plan_code=clean_code).first()
+        return cls.query.options(*options).filter_by(plan_code=clean_code).first()
+
+    @staticmethod
+    def clean_plan_code(plan_code):
+        """Upper-case a user-supplied plan code and drop non-alphanumeric characters."""
+        clean_code = plan_code.upper().strip().translate(_PLAN_CODE_STRIP)
+        if not clean_code.isascii():
+            # Rare non-ASCII input: apply the full Unicode isalnum() rule
+            clean_code = ''.join(c for c in clean_code if c.isalnum())
+        return clean_code
     
     def __repr__(self):
         return f'<Plan {self.plan_name} for {self.student_name} (Code: {self.plan_code})>'
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_courses=True):
+        """
+        Serialize the plan.  List views pass ``include_courses=False`` to
+        skip the nested plan course (and catalog course) serialization; the
+        embedded programs are then reduced to their header fields as well.
+        """
+        data = {
             'id': self.id,
             'student_name': self.student_name,
             'student_email': self.student_email,
@@ -102,85 +260,54 @@ class Plan(db.Model):
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'courses': [course.to_dict() for course in self.courses],
-            'target_program': self.target_program.to_dict() if self.target_program else None,  
-            'current_program': self.current_program.to_dict() if self.current_program else None  
+            'target_program': self.target_program.to_dict(include_requirements=include_courses) if self.target_program else None,  
+            'current_program': self.current_program.to_dict(include_requirements=include_courses) if self.current_program else None  
         }
+        if include_courses:
+            data['courses'] = [course.to_dict() for course in self.courses]
+        return data
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def normalize_category(category):
-        """Normalize category names to handle variations"""
+        """Normalize category names to handle variations (memoised; inputs are a small set)"""
         if not category:
             return 'Uncategorized'
         
         category_lower = category.lower().strip()
         
         # Map variations to standard names
-        mappings = {
-            'math/analytical reasoning': 'Mathematics',
-            'mathematical reasoning': 'Mathematics',
-            'math': 'Mathematics',
-            'mathematics': 'Mathematics',
-            'english composition': 'English',
-            'composition': 'English',
-            'english': 'English',
-            'science': 'Science',
-            'sciences': 'Science',
-            'biology': 'Science',
-            'chemistry': 'Science',
-            'physics': 'Physics',
-            'physical science': 'Physics',
-            'humanities': 'Humanities',
-            'social sciences': 'Social Sciences',
-            'social science': 'Social Sciences',
-            'arts': 'Arts',
-            'fine arts': 'Arts'
-        }
-        
-        return mappings.get(category_lower, category)
+        return CATEGORY_ALIASES.get(category_lower, category)
 
     
-    def calculate_progress(self, program=None, view_filter='All Courses'):
+    def calculate_progress(self, program=None, view_filter='All Courses', include_course_details=True):
         """
         If `program` is None, return progress for both current and target programs.
         If `program` is provided, return progress for that single program.
+
+        Callers that only need requirement totals can pass
+        ``include_course_details=False`` to skip building the per-course
+        entries of simple requirements (their ``courses`` lists stay empty).
         """
-        def canon(s):
-            # Fallback to normalize_category if you have one
-            try:
-                return self.normalize_category(s)
-            except Exception:
-                import re
-                s = (s or '').lower()
-                s = re.sub(r'\W+', ' ', s).strip()
-                return s
-
-        def status_key(s):
-            label = (s or '').strip().lower()
-            # All Courses shows everything
-            if label in ('', 'all', 'all courses', 'all-courses'):
-                return None
-            # Map common UI labels to internal status values
-            mapping = {
-                'completed courses': 'completed',
-                'completed': 'completed',
-                'in progress': 'in_progress',
-                'in-progress': 'in_progress',
-                'planned': 'planned',
-            }
-            return mapping.get(label, None)
+        canon = _canon
+        status_key = _status_key
 
         # Overview: compute both current and transfer progress
         if program is None:
+            # Same program on both sides: the evaluation depends only on the
+            # program and view, so compute it once and share the result.
+            if self.current_program is not None and self.current_program is self.target_program:
+                shared = self.calculate_progress(self.target_program, view_filter, include_course_details)
+                return {'current': shared, 'transfer': shared}
             return {
-                'current': self.calculate_progress(self.current_program, view_filter)
+                'current': self.calculate_progress(self.current_program, view_filter, include_course_details)
                         if self.current_program else {
                             'percent': 0,
                             'requirements': [],
                             'total_credits_earned': 0,
                             'total_credits_required': 0,
                         },
-                'transfer': self.calculate_progress(self.target_program, view_filter)
+                'transfer': self.calculate_progress(self.target_program, view_filter, include_course_details)
                             if self.target_program else {
                                 'percent': 0,
                                 'requirements': [],
@@ -194,6 +321,15 @@ class Plan(db.Model):
         prog_institution = getattr(program, 'institution', None)
         status_filter = status_key(view_filter)
 
+        # Resolve equivalencies for every plan course up front; relevance and
+        # requirement matching then read them from the per-plan cache.
+        is_target = prog_id is not None and prog_id == self.program_id
+        if is_target:
+            try:
+                self._prefetch_equivalents(self.courses or [], prog_institution)
+            except Exception:
+                pass
+
         # Filter plan courses by status and relevance
         relevant_courses = []
         for pc in self.courses or []:
@@ -209,11 +345,7 @@ class Plan(db.Model):
         requirements_data = []
         
         # Check if grouped evaluation is enabled
-        try:
-            from config import Config as _Cfg
-            use_grouped_evaluation = _Cfg.PROGRESS_USE_GROUPED_EVALUATION
-        except Exception:
-            use_grouped_evaluation = False
+        use_grouped_evaluation = bool(getattr(_Cfg, 'PROGRESS_USE_GROUPED_EVALUATION', False))
         
         # For "All Courses" view (status_filter is None), preserve legacy behavior
         # to show anticipated progress from planned/in_progress courses with equivalencies.
@@ -223,23 +355,30 @@ class Plan(db.Model):
         else:
             use_strict_grouped_eval = False
         
+        # Canonicalise each relevant course's category once and index by it
+        # and by group, so each simple requirement picks its candidates with
+        # dict lookups and compares precomputed strings.
+        course_index = self._index_courses(relevant_courses, canon)
+
+        total_required = 0
+        total_earned = 0
         for req in program.requirements or []:
             req_type = getattr(req, 'requirement_type', 'simple')
             req_total = getattr(req, 'credits_required', 0) or 0
             
             # Use grouped evaluator for grouped requirements when flag is enabled and strict mode is on
             if use_strict_grouped_eval and req_type == 'grouped':
-                requirements_data.append(
-                    self._evaluate_grouped_requirement(req, relevant_courses, req_total, program, prog_id)
-                )
+                req_data = self._evaluate_grouped_requirement(req, relevant_courses, req_total, program, prog_id)
             else:
                 # Simple requirements or grouped with flag disabled (legacy behavior)
-                requirements_data.append(
-                    self._evaluate_simple_requirement(req, relevant_courses, req_total, program, prog_id, canon)
-                )
+                req_data = self._evaluate_simple_requirement(req, relevant_courses, req_total, program, prog_id, canon,
+                                                             course_index=course_index,
+                                                             include_details=include_course_details)
+            requirements_data.append(req_data)
+            # Running totals instead of two extra passes over requirements_data
+            total_required += req_data['totalCredits']
+            total_earned += req_data['completedCredits']
 
-        total_required = sum(r['totalCredits'] for r in requirements_data)
-        total_earned = sum(r['completedCredits'] for r in requirements_data)
         percent = (total_earned / total_required * 100) if total_required else 0
 
         return {
@@ -262,6 +401,8 @@ class Plan(db.Model):
             logging.warning(f"Grouped evaluation failed for requirement {req.id}: {e}")
             eval_result = None
         
+        req_category = getattr(req, 'category', '')
+        
         # Extract results from evaluator
         total_earned = int((eval_result or {}).get('credits_earned', 0))
         clamped = min(total_earned, req_total) if req_total else total_earned
@@ -281,13 +422,17 @@ class Plan(db.Model):
         
         if hasattr(req, 'constraints') and req.constraints:
             import logging
+            from .constraint import RequirementConstraint
             logging.info(f"Evaluating {len(req.constraints)} constraint(s) for requirement {req.id} ({req.category})")
             
+            # Filter out courses marked as constraint violations before evaluating;
+            # the same resolved rows are shared by every constraint below
+            valid_courses = [c for c in relevant_courses if not getattr(c, 'constraint_violation', False)]
+            valid_rows = RequirementConstraint.course_rows(valid_courses)
+            
             for constraint in req.constraints:
                 try:
-                    # Filter out courses marked as constraint violations before evaluating
-                    valid_courses = [c for c in relevant_courses if not getattr(c, 'constraint_violation', False)]
-                    constraint_eval = constraint.evaluate(valid_courses)
+                    constraint_eval = constraint.evaluate(valid_courses, rows=valid_rows)
                     constraint_results.append({
                         **constraint_eval,
                         'constraint_type': constraint.constraint_type,
@@ -340,8 +485,8 @@ class Plan(db.Model):
         return {
             'id': getattr(req, 'id', None),
             'program_id': prog_id,  # Add program_id so frontend knows which program this belongs to
-            'name': getattr(req, 'category', ''),
-            'category': getattr(req, 'category', ''),
+            'name': req_category,
+            'category': req_category,
             'status': req_status,
             'completedCredits': clamped,
             'totalCredits': req_total,
@@ -353,20 +498,43 @@ class Plan(db.Model):
             'constraints_satisfied': all_constraints_satisfied,
         }
 
-    def _evaluate_simple_requirement(self, req, relevant_courses, req_total, program, prog_id, canon):
+    @staticmethod
+    def _index_courses(plan_courses, canon):
+        """
+        Return (canons, by_category, by_group): each plan course's canonical
+        category by position, plus maps from canonical category and
+        requirement_group_id to the positions of matching plan courses.
+        """
+        canons = []
+        by_category = defaultdict(list)
+        by_group = defaultdict(list)
+        for pos, pc in enumerate(plan_courses):
+            course_canon = canon(getattr(pc, 'requirement_category', ''))
+            canons.append(course_canon)
+            by_category[course_canon].append(pos)
+            group_id = getattr(pc, 'requirement_group_id', None)
+            if group_id is not None:
+                by_group[group_id].append(pos)
+        return canons, by_category, by_group
+
+    def _evaluate_simple_requirement(self, req, relevant_courses, req_total, program, prog_id, canon,
+                                     course_index=None, include_details=True):
         """Evaluate a simple requirement or grouped requirement in legacy mode."""
-        req_canon = canon(getattr(req, 'category', ''))
+        req_category = getattr(req, 'category', '')
+        req_canon = canon(req_category)
         req_type = getattr(req, 'requirement_type', 'simple')
+        # Equivalency matching and annotation only apply to the target program
+        is_target = prog_id == getattr(self, 'program_id', None)
         
         # For grouped requirements in legacy mode, collect group IDs and allowed codes
-        group_ids = []
+        group_ids = set()
         allowed_codes = set()
         if req_type == 'grouped':
             try:
                 for g in (req.groups or []):
-                    group_ids.append(g.id)
+                    group_ids.add(g.id)
                     for opt in (g.course_options or []):
-                        code_norm = (getattr(opt, 'course_code', '') or '').upper().replace('-', ' ').strip()
+                        code_norm = _norm_code(getattr(opt, 'course_code', ''))
                         if code_norm:
                             allowed_codes.add(code_norm)
             except Exception:
@@ -376,18 +544,31 @@ class Plan(db.Model):
         completed = 0
         applied = []
         
-        for pc in relevant_courses:
-            course_canon = canon(getattr(pc, 'requirement_category', ''))
-            cat_match = (course_canon == req_canon)
+        # Unless the code-based match below applies (it has to inspect every
+        # course), only category/group matches can count: take them from the
+        # index, in original order.
+        if course_index is None:
+            course_index = self._index_courses(relevant_courses, canon)
+        canons, by_category, by_group = course_index
+        positions = range(len(relevant_courses))
+        if not (allowed_codes and is_target):
+            hits = set(by_category.get(req_canon, ()))
+            for group_id in group_ids:
+                hits.update(by_group.get(group_id, ()))
+            positions = sorted(hits)
+        
+        for pos in positions:
+            pc = relevant_courses[pos]
+            cat_match = (canons[pos] == req_canon)
             group_match = (group_ids and getattr(pc, 'requirement_group_id', None) in group_ids)
             
             # For target program grouped requirements without direct group assignment,
             # allow equivalency-driven or direct code match
-            if not group_match and allowed_codes and prog_id == getattr(self, 'program_id', None):
+            if not group_match and allowed_codes and is_target:
                 try:
                     eq_course = self._get_equivalent_course(pc, program)
                     if eq_course:
-                        eq_code_norm = (eq_course.code or '').upper().replace('-', ' ').strip()
+                        eq_code_norm = _norm_code(eq_course.code)
                         if eq_code_norm in allowed_codes:
                             group_match = True
                 except Exception:
@@ -397,7 +578,7 @@ class Plan(db.Model):
                 if not group_match and getattr(pc, 'course', None):
                     if getattr(pc.course, 'institution', None) == program.institution:
                         try:
-                            own_code_norm = (pc.course.code or '').upper().replace('-', ' ').strip()
+                            own_code_norm = _norm_code(pc.course.code)
                             if own_code_norm in allowed_codes:
                                 group_match = True
                         except Exception:
@@ -407,8 +588,10 @@ class Plan(db.Model):
                 continue
             
             # Course matches - add its credits
-            credits = (pc.credits or (pc.course.credits if pc.course else 0) or 0)
+            credits = pc.effective_credits
             completed += credits
+            if not include_details:
+                continue
             
             ci = {
                 'id': pc.course.id if pc.course else None,
@@ -420,7 +603,7 @@ class Plan(db.Model):
             }
             
             # Add equivalency info for target program courses
-            if prog_id == getattr(self, 'program_id', None):
+            if is_target:
                 try:
                     eq = self._get_equivalent_course(pc, program)
                     if eq:
@@ -443,8 +626,8 @@ class Plan(db.Model):
         return {
             'id': getattr(req, 'id', None),
             'program_id': prog_id,  # Add program_id so frontend knows which program this belongs to
-            'name': getattr(req, 'category', ''),
-            'category': getattr(req, 'category', ''),
+            'name': req_category,
+            'category': req_category,
             'status': req_status,
             'completedCredits': clamped,
             'totalCredits': req_total,
@@ -473,32 +656,54 @@ class Plan(db.Model):
         
         return False
     
-    def _get_equivalent_course(self, plan_course, target_program):
-        """Get the equivalent course at the target program"""
+    def _equivalent_cache(self):
+        """Per-instance map of (from_course_id, institution) -> equivalent Course or None."""
+        cache = getattr(self, '_equivalents', None)
+        if cache is None:
+            cache = self._equivalents = {}
+        return cache
+
+    def _prefetch_equivalents(self, plan_courses, institution):
+        """Resolve equivalents at `institution` for all `plan_courses` in one query."""
         from .equivalency import Equivalency
         from .course import Course
-        
+        from sqlalchemy.orm import contains_eager
+
+        cache = self._equivalent_cache()
+        ids = {pc.course.id for pc in plan_courses
+               if pc.course and (pc.course.id, institution) not in cache}
+        if not ids:
+            return
+        for course_id in ids:
+            cache[(course_id, institution)] = None
+        rows = (Equivalency.query
+                .join(Equivalency.to_course)
+                .options(contains_eager(Equivalency.to_course))
+                .filter(Equivalency.from_course_id.in_(ids),
+                        Course.institution == institution)
+                .order_by(Equivalency.id)
+                .all())
+        for eq in rows:
+            key = (eq.from_course_id, institution)
+            if cache[key] is None and eq.to_course:
+                cache[key] = eq.to_course
+
+    def _get_equivalent_course(self, plan_course, target_program):
+        """Get the equivalent course at the target program"""
         if not plan_course.course:
             return None
 
         # Prefer an equivalency that maps specifically to the target institution.
-        try:
-            # Join to the Course table for the target (to_course) to filter by institution.
-            to_alias = Course
-            eq = (Equivalency.query
-                  .join(to_alias, Equivalency.to_course_id == to_alias.id)
-                  .filter(
-                      Equivalency.from_course_id == plan_course.course.id,
-                      to_alias.institution == target_program.institution
-                  )
-                  .first())
-            if eq and eq.to_course:
-                return eq.to_course
-        except Exception:
-            pass
-
-        # Fallback: return None (either no mapping to target institution, or only 'no equivalent')
-        return None
+        # Either no mapping to the target institution or only 'no equivalent'
+        # resolves to None.
+        key = (plan_course.course.id, target_program.institution)
+        cache = self._equivalent_cache()
+        if key not in cache:
+            try:
+                self._prefetch_equivalents([plan_course], target_program.institution)
+            except Exception:
+                return None
+        return cache.get(key)
     
     def check_course_constraint_violations(self, course_id, requirement_category, requirement_group_id=None):
         """Check if adding a course would violate any constraints.
@@ -507,6 +712,7 @@ class Plan(db.Model):
             dict with 'violates' (bool) and 'violations' (list of violation descriptions)
         """
         from .course import Course
+        from .constraint import RequirementConstraint
         
         course = Course.query.get(course_id)
         if not course or not self.target_program:
@@ -539,8 +745,12 @@ class Plan(db.Model):
         
         # Test with the new course added
         test_courses = existing_courses + [temp_plan_course]
+        test_rows = RequirementConstraint.course_rows(test_courses)
         
         violations = []
+        # Resolved on first group-scoped constraint, then reused
+        group = None
+        group_loaded = False
         for constraint in requirement.constraints:
             try:
                 # Check if constraint applies to this specific course based on scope
@@ -549,12 +759,14 @@ class Plan(db.Model):
                 # If there's a group scope and it doesn't match, skip this constraint
                 if scope.get('group_name') and requirement_group_id:
                     # Get group name for this requirement_group_id
-                    from .program import RequirementGroup
-                    group = RequirementGroup.query.get(requirement_group_id)
+                    if not group_loaded:
+                        from .program import RequirementGroup
+                        group = db.session.get(RequirementGroup, requirement_group_id)
+                        group_loaded = True
                     if group and group.group_name != scope.get('group_name'):
                         continue
                 
-                eval_result = constraint.evaluate(test_courses)
+                eval_result = constraint.evaluate(test_courses, rows=test_rows)
                 
                 if not eval_result.get('satisfied', True):
                     violations.append({
@@ -577,20 +789,25 @@ class Plan(db.Model):
             'violations': violations
         }
     
+    def _completed_credits_by_category(self):
+        """Sum completed credits per normalized requirement category in one pass."""
+        canon = self.normalize_category
+        totals = defaultdict(int)
+        for pc in self.courses:
+            if pc.status == 'completed':
+                totals[canon(getattr(pc, 'requirement_category', ''))] += pc.effective_credits
+        return totals
+
     def get_unmet_requirements(self):
         unmet = []
         if not self.target_program:
             return unmet
             
         canon = self.normalize_category
+        totals = self._completed_credits_by_category()
         # Compare plan's completed credits against the TARGET program's requirements
         for requirement in (self.target_program.requirements or []):
-            completed_credits = sum(
-                (pc.credits or (pc.course.credits if pc.course else 0) or 0)
-                for pc in self.courses
-                if pc.status == 'completed'
-                and canon(getattr(pc, 'requirement_category', '')) == canon(requirement.category)
-            )
+            completed_credits = totals.get(canon(requirement.category), 0)
             if completed_credits < requirement.credits_required:
                 unmet.append({
                     'category': requirement.category,
@@ -600,20 +817,43 @@ class Plan(db.Model):
         return unmet
 
 
-    def suggest_courses_for_requirements(self):
+    def suggest_courses_for_requirements(self, unmet_requirements=None):
+        """Suggest courses for each unmet requirement.
+
+        Callers that already computed get_unmet_requirements() can pass the
+        result to avoid evaluating it twice.
+        """
         suggestions = []
-        # Exclude any course already on the plan (planned, in_progress, completed)
-        excluded_course_ids = [course.course_id for course in (self.courses or [])]
-        unmet_requirements = self.get_unmet_requirements()
+        # One pass over the plan: exclude any course already on it (planned,
+        # in_progress, completed) and note whether any carries an institution
+        # (plan-wide, so evaluated once rather than per unmet requirement)
+        excluded_course_ids = set()
+        has_transfer_courses = False
+        for course in self.courses or []:
+            excluded_course_ids.add(course.course_id)
+            if not has_transfer_courses and course.course and course.course.institution:
+                has_transfer_courses = True
+        if unmet_requirements is None:
+            unmet_requirements = self.get_unmet_requirements()
+
+        requirements_by_category = {}
+        for req in self.target_program.requirements:
+            requirements_by_category.setdefault(req.category, req)
+
+        # Fetch candidates for every subject-mapped simple requirement in one
+        # query instead of one query per unmet requirement.
+        wanted_subjects = set()
+        for unmet_req in unmet_requirements:
+            req = requirements_by_category.get(unmet_req['category'])
+            if req is not None and req.requirement_type != 'grouped':
+                wanted_subjects.update(SUBJECT_MAPPINGS.get((unmet_req['category'] or '').strip().lower(), ()))
+        candidates_by_subject = self._prefetch_subject_candidates(wanted_subjects, excluded_course_ids)
 
         for unmet_req in unmet_requirements:
             category = unmet_req['category']
             credits_needed = unmet_req['credits_needed']
             
-            program_requirement = next(
-                (req for req in self.target_program.requirements if req.category == category), 
-                None
-            )
+            program_requirement = requirements_by_category.get(category)
             
             if not program_requirement:
                 continue
@@ -632,31 +872,54 @@ class Plan(db.Model):
             else:
                 # Only propose courses that would actually count for this requirement
                 category_suggestions['course_options'] = self._get_simple_requirement_suggestions(
-                    category, excluded_course_ids, credits_needed, program_requirement
+                    category, excluded_course_ids, credits_needed, program_requirement,
+                    candidates_by_subject=candidates_by_subject
                 )
             
-            if any(course.course and course.course.institution for course in (self.courses or [])):
+            suggestions.append(category_suggestions)
+        
+        if has_transfer_courses:
+            # One equivalency query for the options of every category
+            equivalencies_by_target = self._transfer_equivalencies_by_target(
+                [opt['id'] for category_suggestions in suggestions for opt in category_suggestions['course_options']]
+            )
+            for category_suggestions in suggestions:
                 category_suggestions['transfer_options'] = self._get_transfer_suggestions(
-                    category_suggestions['course_options']
+                    category_suggestions['course_options'], equivalencies_by_target
                 )
-            
-            suggestions.append(category_suggestions)
         
         return suggestions
 
     def _get_grouped_requirement_suggestions(self, requirement, excluded_course_ids):
         from .course import Course
         
+        from sqlalchemy import tuple_
+        
         suggestions = []
+        default_institution = self.target_program.institution
+        
+        # Resolve every option with one (code, institution) IN query rather
+        # than one lookup per option.
+        keys = {
+            (course_option.course_code, course_option.institution or default_institution)
+            for group in requirement.groups
+            for course_option in group.course_options
+        }
+        by_key = {}
+        if keys:
+            for course in Course.query.filter(
+                tuple_(Course.code, Course.institution).in_(keys),
+                ~Course.id.in_(self._excluded_ids_clause(excluded_course_ids))
+            ).all():
+                by_key.setdefault((course.code, course.institution), course)
         
         for group in requirement.groups:
             for course_option in group.course_options:
-                course = Course.query.filter_by(
-                    code=course_option.course_code,
-                    institution=course_option.institution or self.target_program.institution
-                ).first()
+                course = by_key.get(
+                    (course_option.course_code, course_option.institution or default_institution)
+                )
                 
-                if course and course.id not in excluded_course_ids:
+                if course:
                     suggestions.append({
                         'id': course.id,
                         'code': course.code,
@@ -672,63 +935,123 @@ class Plan(db.Model):
         
         return suggestions
 
-    def _get_simple_requirement_suggestions(self, category, excluded_course_ids, credits_needed, program_requirement=None):
-        """Suggest only courses at the target institution that would satisfy the given simple requirement.
+    def _excluded_ids_clause(self, excluded_course_ids):
+        """IN-clause operand for courses already on the plan."""
+        from sqlalchemy import select
 
-        This uses subject-code based mappings rather than broad department matches, and excludes
-        courses already completed in the plan. If a mapping isn't found, it falls back to the
-        requirement's category as a conservative filter on department name.
+        if self.id is not None:
+            # Exclude the plan's own courses with a subquery so the SQL text
+            # stays constant instead of inlining one parameter per course.
+            return select(PlanCourse.course_id).where(PlanCourse.plan_id == self.id)
+        return list(excluded_course_ids)
+
+    def _suggestion_candidate_query(self, excluded_course_ids):
+        """Base query for suggestable courses at the target institution.
+
+        The description/prerequisites text is deferred: candidates are
+        ranked on narrow columns and only the chosen ones load it.
         """
         from .course import Course
+        from sqlalchemy.orm import defer
 
-        # Centralised subject mappings for common requirement categories
-        subject_mappings = {
-            'english composition': ['ENGL', 'ENG'],
-            'composition': ['ENGL', 'ENG'],
-            'english': ['ENGL', 'ENG'],
-            'literature': ['ENGL', 'LIT'],
-            'mathematics': ['MATH', 'STAT'],
-            'math': ['MATH', 'STAT'],
-            'analytical reasoning': ['MATH', 'STAT', 'PHIL'],
-            'reasoning': ['PHIL', 'MATH'],
-            'biology': ['BIOL', 'BIO'],
-            'chemistry': ['CHEM'],
-            'physics': ['PHYS'],
-            'history': ['HIST'],
-            'science': ['BIOL', 'CHEM', 'PHYS'],
-            'social sciences': ['SOC', 'PSY', 'POLI'],
-            'social science': ['SOC', 'PSY', 'POLI'],
-            'humanities': ['ENGL', 'HIST', 'PHIL', 'ART', 'MUSC', 'THEA'],
-            'arts': ['ART', 'MUSC', 'THEA'],
-            'fine arts': ['ART', 'MUSC', 'THEA'],
-            'liberal arts': ['ENGL', 'HIST', 'PHIL', 'ART', 'MUSC', 'THEA', 'SOC', 'PSY', 'POLI'],
-        }
+        return Course.query.options(
+            defer(Course.description), defer(Course.prerequisites)
+        ).filter(
+            Course.institution == self.target_program.institution,
+            ~Course.id.in_(self._excluded_ids_clause(excluded_course_ids))
+        ).order_by(Course.id)
 
-        norm = (category or '').strip().lower()
-        subjects = subject_mappings.get(norm, [])
+    @classmethod
+    def _fetch_credit_bearing(cls, query, limit=None, per_subject=None):
+        """Run a candidate query, excluding courses below the 1000 level when possible.
 
-        query = Course.query.filter(
-            Course.institution == self.target_program.institution,
-            ~Course.id.in_(excluded_course_ids)
-        )
-        if subjects:
-            query = query.filter(Course.subject_code.in_(subjects))
-        else:
-            # Fallback: filter by department string containing the category
-            if norm:
-                query = query.filter(Course.department.ilike(f"%{category}%"))
+        ``limit`` caps the whole result; ``per_subject`` caps it per subject
+        code (lowest ids first), both in SQL.
+        """
+        from .course import Course
+
+        def run(q):
+            if per_subject:
+                q = cls._first_per_subject(q, per_subject)
+            return (q.limit(limit) if limit else q).all()
 
-        # Pull a modest set; we'll validate each against the requirement
-        # Exclude developmental or non-credit-bearing courses (below 1000 level) when possible
         # Be strict: if course_level is NULL, use course_number_numeric as fallback
         try:
-            candidates = query.filter(
+            return run(query.filter(
                 ((Course.course_level != None) & (Course.course_level >= 1000)) |
                 ((Course.course_level == None) & (Course.course_number_numeric >= 1000))
-            ).limit(30).all()
+            ))
         except Exception:
             # Fallback if the above filter fails
-            candidates = query.limit(30).all()
+            return run(query)
+
+    @staticmethod
+    def _first_per_subject(query, limit):
+        """Restrict a Course query to its first `limit` rows by id within each subject code."""
+        from .course import Course
+        from sqlalchemy import func, select
+
+        ranked = (query.with_entities(
+                      Course.id.label('course_id'),
+                      func.row_number().over(
+                          partition_by=Course.subject_code, order_by=Course.id
+                      ).label('subject_rank'))
+                  .order_by(None)
+                  .subquery())
+        return query.filter(Course.id.in_(
+            select(ranked.c.course_id).where(ranked.c.subject_rank <= limit)
+        ))
+
+    def _prefetch_subject_candidates(self, subjects, excluded_course_ids):
+        """Load candidate courses for all `subjects` at once, grouped by subject code.
+
+        Each category keeps its first SUGGESTION_CANDIDATE_LIMIT candidates by
+        id across its subjects, and those always fall within the first
+        SUGGESTION_CANDIDATE_LIMIT of each subject, so the per-subject bound
+        loses nothing while keeping large catalogs out of memory.
+        """
+        from .course import Course
+
+        by_subject = defaultdict(list)
+        if subjects:
+            query = self._suggestion_candidate_query(excluded_course_ids).filter(
+                Course.subject_code.in_(subjects)
+            )
+            for course in self._fetch_credit_bearing(query, per_subject=SUGGESTION_CANDIDATE_LIMIT):
+                by_subject[course.subject_code].append(course)
+        return by_subject
+
+    def _get_simple_requirement_suggestions(self, category, excluded_course_ids, credits_needed, program_requirement=None,
+                                            candidates_by_subject=None):
+        """Suggest only courses at the target institution that would satisfy the given simple requirement.
+
+        This uses subject-code based mappings rather than broad department matches, and excludes
+        courses already completed in the plan. If a mapping isn't found, it falls back to the
+        requirement's category as a conservative filter on department name.
+        """
+        from .course import Course
+
+        norm = (category or '').strip().lower()
+        subjects = SUBJECT_MAPPINGS.get(norm, ())
+
+        # Pull a modest set; we'll validate each against the requirement
+        # Exclude developmental or non-credit-bearing courses (below 1000 level) when possible
+        if subjects and candidates_by_subject is not None:
+            # Already loaded by suggest_courses_for_requirements; merge back
+            # into id order so the cut matches the per-category query.
+            candidates = sorted(
+                (c for subj in set(subjects) for c in candidates_by_subject.get(subj, ())),
+                key=lambda c: c.id
+            )[:SUGGESTION_CANDIDATE_LIMIT]
+        else:
+            query = self._suggestion_candidate_query(excluded_course_ids)
+            if subjects:
+                query = query.filter(Course.subject_code.in_(subjects))
+            else:
+                # Fallback: filter by department string containing the category
+                if norm:
+                    query = query.filter(Course.department.ilike(f"%{category}%"))
+            candidates = self._fetch_credit_bearing(query, SUGGESTION_CANDIDATE_LIMIT)
         
         # Additional filtering: remove courses with "No equivalent" or NE suffix
         candidates = [c for c in candidates if c.code and not (
@@ -736,24 +1059,44 @@ class Plan(db.Model):
             (c.title and 'no equivalent' in c.title.lower())
         )]
 
-        valid = []
-        for course in candidates:
-            if self._will_course_satisfy_requirement(course, program_requirement, category_hint=category):
-                valid.append({
-                    'id': course.id,
-                    'code': course.code,
-                    'title': course.title,
-                    'credits': course.credits,
-                    'institution': course.institution,
-                    'department': course.department,
-                    'description': course.description,
-                    'prerequisites': course.prerequisites,
-                    'is_preferred': False
-                })
-
         # Sort by subject/course number for stable ordering; trim to roughly credits_needed scope
         # We can't ensure exact credit matching here; leave selection to the user with clear options
-        return valid[:12]
+        if subjects:
+            # The candidate query already restricts to the mapped subjects at
+            # the target institution, which is exactly the simple-requirement
+            # check; only the department fallback needs re-validating.
+            winners = candidates[:12]
+        else:
+            winners = [
+                course for course in candidates
+                if self._will_course_satisfy_requirement(course, program_requirement, category_hint=category)
+            ][:12]
+        self._load_deferred_details(winners)
+        return [{
+            'id': course.id,
+            'code': course.code,
+            'title': course.title,
+            'credits': course.credits,
+            'institution': course.institution,
+            'department': course.department,
+            'description': course.description,
+            'prerequisites': course.prerequisites,
+            'is_preferred': False
+        } for course in winners]
+
+    @staticmethod
+    def _load_deferred_details(courses):
+        """Load the deferred text columns of the chosen suggestions with one query."""
+        from .course import Course
+        from sqlalchemy import inspect as sa_inspect
+        from sqlalchemy.orm import undefer
+
+        ids = [c.id for c in courses if 'description' in sa_inspect(c).unloaded]
+        if ids:
+            # Rows already in the identity map only get their unloaded attributes filled
+            Course.query.filter(Course.id.in_(ids)).options(
+                undefer(Course.description), undefer(Course.prerequisites)
+            ).all()
 
     def _will_course_satisfy_requirement(self, course, requirement, category_hint: str | None = None) -> bool:
         """Return True if the candidate course would count toward the requirement.
@@ -781,28 +1124,7 @@ class Plan(db.Model):
         # Simple requirement validation by subject mapping
         category = (requirement.category if isinstance(requirement, ProgramRequirement) else category_hint) or ''
         norm = category.strip().lower()
-        subject_mappings = {
-            'english composition': ['ENGL', 'ENG'],
-            'composition': ['ENGL', 'ENG'],
-            'english': ['ENGL', 'ENG'],
-            'literature': ['ENGL', 'LIT'],
-            'mathematics': ['MATH', 'STAT'],
-            'math': ['MATH', 'STAT'],
-            'analytical reasoning': ['MATH', 'STAT', 'PHIL'],
-            'reasoning': ['PHIL', 'MATH'],
-            'biology': ['BIOL', 'BIO'],
-            'chemistry': ['CHEM'],
-            'physics': ['PHYS'],
-            'history': ['HIST'],
-            'science': ['BIOL', 'CHEM', 'PHYS'],
-            'social sciences': ['SOC', 'PSY', 'POLI'],
-            'social science': ['SOC', 'PSY', 'POLI'],
-            'humanities': ['ENGL', 'HIST', 'PHIL', 'ART', 'MUSC', 'THEA'],
-            'arts': ['ART', 'MUSC', 'THEA'],
-            'fine arts': ['ART', 'MUSC', 'THEA'],
-            'liberal arts': ['ENGL', 'HIST', 'PHIL', 'ART', 'MUSC', 'THEA', 'SOC', 'PSY', 'POLI'],
-        }
-        subjects = subject_mappings.get(norm, [])
+        subjects = _CATEGORY_SUBJECT_SETS.get(norm)
         if subjects:
             return (course.subject_code or '').upper() in subjects and course.institution == self.target_program.institution
         # Fallback to department contains category keyword
@@ -811,49 +1133,85 @@ class Plan(db.Model):
             return (norm in dept) and course.institution == self.target_program.institution
         return False
 
-    def _get_transfer_suggestions(self, course_options):
+    @staticmethod
+    def _transfer_equivalencies_by_target(option_ids):
+        """
+        Load Delgado-sourced equivalencies into the given target course ids
+        with one IN query (source-institution filter applied in SQL), grouped
+        by to_course_id.
+        """
         from .equivalency import Equivalency
+        from .course import Course
+        from sqlalchemy.orm import aliased, contains_eager, joinedload
         
+        by_target = defaultdict(list)
+        if not option_ids:
+            return by_target
+        source = aliased(Course)
+        for equiv in (Equivalency.query
+                      .join(Equivalency.from_course.of_type(source))
+                      .options(contains_eager(Equivalency.from_course.of_type(source)),
+                               joinedload(Equivalency.to_course))
+                      .filter(Equivalency.to_course_id.in_(set(option_ids)),
+                              source.institution == 'Delgado Community College')
+                      .all()):
+            by_target[equiv.to_course_id].append(equiv)
+        return by_target
+
+    def _get_transfer_suggestions(self, course_options, by_target=None):
         transfer_options = []
+        if by_target is None:
+            by_target = self._transfer_equivalencies_by_target(
+                [course_option['id'] for course_option in course_options]
+            )
         
+        # Output order follows course_options
         for course_option in course_options:
-            equivalencies = Equivalency.query.filter_by(to_course_id=course_option['id']).all()
-            
-            for equiv in equivalencies:
-                if equiv.from_course.institution == 'Delgado Community College':
-                    transfer_options.append({
-                        'dcc_course': {
-                            'id': equiv.from_course.id,
-                            'code': equiv.from_course.code,
-                            'title': equiv.from_course.title,
-                            'credits': equiv.from_course.credits,
-                            'description': equiv.from_course.description,
-                            'prerequisites': equiv.from_course.prerequisites
-                        },
-                        'uno_equivalent': {
-                            'id': equiv.to_course.id,
-                            'code': equiv.to_course.code,
-                            'title': equiv.to_course.title,
-                            'credits': equiv.to_course.credits
-                        },
-                        'equivalency_type': equiv.equivalency_type,
-                        'notes': equiv.notes
-                    })
+            for equiv in by_target.get(course_option['id'], ()):
+                transfer_options.append({
+                    'dcc_course': {
+                        'id': equiv.from_course.id,
+                        'code': equiv.from_course.code,
+                        'title': equiv.from_course.title,
+                        'credits': equiv.from_course.credits,
+                        'description': equiv.from_course.description,
+                        'prerequisites': equiv.from_course.prerequisites
+                    },
+                    'uno_equivalent': {
+                        'id': equiv.to_course.id,
+                        'code': equiv.to_course.code,
+                        'title': equiv.to_course.title,
+                        'credits': equiv.to_course.credits
+                    },
+                    'equivalency_type': equiv.equivalency_type,
+                    'notes': equiv.notes
+                })
         
         return transfer_options
 
     def _analyze_transfer_equivalencies(self, completed_courses):
         from .equivalency import Equivalency
+        from sqlalchemy.orm import joinedload
         
         transfer_courses = []
         total_transfer_credits = 0
         
+        # Fetch equivalencies for all completed courses in one query.
+        source_ids = {course.course_id for course in completed_courses}
+        by_source = defaultdict(list)
+        if source_ids:
+            for equiv in (Equivalency.query
+                          .options(joinedload(Equivalency.to_course))
+                          .filter(Equivalency.from_course_id.in_(source_ids))
+                          .all()):
+                by_source[equiv.from_course_id].append(equiv)
+        
         for course in completed_courses:
-            equivalencies = Equivalency.query.filter_by(from_course_id=course.course_id).all()
+            equivalencies = by_source.get(course.course_id)
             
             if equivalencies:
+                course_credits = course.effective_credits
                 for equiv in equivalencies:
-                    course_credits = course.credits or course.course.credits or 0
                     transfer_courses.append({
                         'from_course': course.course.code,
                         'from_title': course.course.title,
@@ -872,22 +1230,14 @@ class Plan(db.Model):
         }
 
     def _calculate_gpa(self, completed_courses):
-        grade_points = {
-            'A': 4.0, 'A-': 3.7,
-            'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-            'D+': 1.3, 'D': 1.0, 'D-': 0.7,
-            'F': 0.0
-        }
-        
         total_quality_points = 0
         total_credit_hours = 0
         graded_courses = 0
         
         for course in completed_courses:
-            if course.grade and course.grade.upper() in grade_points:
-                credits = course.credits or course.course.credits or 0
-                points = grade_points[course.grade.upper()]
+            points = GRADE_POINTS.get((course.grade or '').upper())
+            if points is not None:
+                credits = course.effective_credits
                 total_quality_points += points * credits
                 total_credit_hours += credits
                 graded_courses += 1
@@ -902,24 +1252,24 @@ class Plan(db.Model):
         }
 
     def get_semester_plan(self):
-        semester_plan = {}
+        # One lookup per course; a bucket is built only for a new semester
+        semester_plan = defaultdict(lambda: {
+            'courses': [],
+            'total_credits': 0,
+            'course_count': 0
+        })
         
         for course in self.courses:
             semester_key = f"{course.semester} {course.year}" if course.semester and course.year else "Unscheduled"
             
-            if semester_key not in semester_plan:
-                semester_plan[semester_key] = {
-                    'courses': [],
-                    'total_credits': 0,
-                    'course_count': 0
-                }
-            
+            bucket = semester_plan[semester_key]
             course_data = course.to_dict()
-            semester_plan[semester_key]['courses'].append(course_data)
-            semester_plan[semester_key]['total_credits'] += course.credits or course.course.credits or 0
-            semester_plan[semester_key]['course_count'] += 1
+            bucket['courses'].append(course_data)
+            # to_dict() already resolved the credit fallback; reuse it
+            bucket['total_credits'] += course_data['credits']
+            bucket['course_count'] += 1
         
-        return semester_plan
+        return dict(semester_plan)
 
     def validate_prerequisites(self):
         violations = []
@@ -927,10 +1277,9 @@ class Plan(db.Model):
         
         for plan_course in self.courses:
             if plan_course.status in ['planned', 'in_progress']:
-                prerequisites = plan_course.course.prerequisites
-                if prerequisites:
-                    required_courses = [prereq.strip() for prereq in prerequisites.split(',')]
-                    missing_prereqs = [req for req in required_courses if req and req not in completed_courses]
+                required_courses = plan_course.course.prerequisite_codes
+                if required_courses:
+                    missing_prereqs = [req for req in required_courses if req not in completed_courses]
                     
                     if missing_prereqs:
                         violations.append({
@@ -945,23 +1294,34 @@ class Plan(db.Model):
 
 class PlanCourse(db.Model):
     __tablename__ = 'plan_courses'
-    __table_args__ = {'extend_existing': True}
+    # Progress and audit paths filter a plan's courses by status and category,
+    # and grouped evaluation by requirement group
+    __table_args__ = (
+        db.Index('ix_plan_courses_plan_status_category', 'plan_id', 'status', 'requirement_category'),
+        db.Index('ix_plan_courses_plan_category', 'plan_id', 'requirement_category'),
+        db.Index('ix_plan_courses_plan_group', 'plan_id', 'requirement_group_id'),
+        {'extend_existing': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     plan_id = db.Column(db.Integer, db.ForeignKey('plans.id'), nullable=False, index=True)
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False, index=True)
     semester = db.Column(db.String(50))  
     year = db.Column(db.Integer)
-    status = db.Column(db.String(50), default='planned', index=True)  
+    # status and requirement_category are covered by the composite indexes
+    # in __table_args__; no single-column indexes needed
+    status = db.Column(db.String(50), default='planned')  
     grade = db.Column(db.String(10))
     credits = db.Column(db.Integer)  
-    requirement_category = db.Column(db.String(100), index=True)  
+    requirement_category = db.Column(db.String(100))  
     requirement_group_id = db.Column(db.Integer, db.ForeignKey('requirement_groups.id'), nullable=True, index=True)  
     notes = db.Column(db.Text)
     constraint_violation = db.Column(db.Boolean, default=False, index=True)  # Course violates a constraint
     constraint_violation_reason = db.Column(db.Text)  # Why it violates (for UI display)
     
-    course = db.relationship('Course', backref='plan_courses')
+    # Many-to-one and read on nearly every access (progress, constraints,
+    # to_dict), so load it in the same SELECT as the plan course row.
+    course = db.relationship('Course', backref='plan_courses', lazy='joined')
     requirement_group = db.relationship('RequirementGroup', foreign_keys=[requirement_group_id])
     
     @property
@@ -971,6 +1331,14 @@ class PlanCourse(db.Model):
             return self.requirement_group.group_name
         return None
     
+    @property
+    def effective_credits(self):
+        """Credits for this plan course, falling back to the catalog value."""
+        if self.credits:
+            return self.credits
+        course = self.course
+        return (course.credits if course else 0) or 0
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -981,10 +1349,49 @@ class PlanCourse(db.Model):
             'year': self.year,
             'status': self.status,
             'grade': self.grade,
-            'credits': self.credits or (self.course.credits if self.course else 0),
+            'credits': self.effective_credits,
             'requirement_category': self.requirement_category,
             'requirement_group_id': self.requirement_group_id,  
             'notes': self.notes,
             'constraint_violation': self.constraint_violation or False,
             'constraint_violation_reason': self.constraint_violation_reason
-        }
\ No newline at end of file
+        }
+
+# Adding, editing or removing a plan course counts as updating the plan, so
+# the advisor list's "Recently Updated" sort and date reflect course edits.
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+@event.listens_for(Session, 'before_flush')
+def _touch_plans_for_course_changes(session, flush_context, instances):
+    """
+    Bump ``updated_at`` on every plan whose courses are being inserted,
+    updated or deleted in this flush.  The column's ``onupdate`` only fires
+    when the plan row itself changes.
+    """
+    plans = set()
+    plan_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, PlanCourse):
+            continue
+        # Use the loaded relationship if present (new rows appended via
+        # plan.courses have no plan_id yet), else an in-session plan.  Plans
+        # not in the session are bumped by id below rather than loaded.
+        plan = obj.__dict__.get('plan')
+        if plan is None and obj.plan_id is not None:
+            plan = session.identity_map.get(session.identity_key(Plan, obj.plan_id))
+            if plan is None:
+                plan_ids.add(obj.plan_id)
+                continue
+        if plan is not None and plan not in session.deleted:
+            plans.add(plan)
+    now = datetime.utcnow()
+    for plan in plans:
+        plan.updated_at = now
+    if plan_ids:
+        from sqlalchemy import update
+        session.execute(
+            update(Plan).where(Plan.id.in_(plan_ids)).values(updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
@@ -26,13 +26,34 @@ class Program(db.Model):
     
     # Define relationships - these are already defined in Plan model with foreign_keys specified
     # Remove the ambiguous 'plans' relationship since Plan model handles this properly
+    # Lazy by default; paths that walk the whole tree (to_dict, progress)
+    # load it with requirement_tree_options().
     requirements = db.relationship('ProgramRequirement', backref='program', cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<Program {self.name} ({self.degree_type})>'
+
+    @staticmethod
+    def requirement_tree_options(program_loader=None):
+        """
+        Loader options that fetch requirements -> groups -> course options
+        and constraints with one IN query per level.  Pass a loader ending at
+        a Program (e.g. ``joinedload(Plan.target_program)``) to chain from
+        it; without one the options apply to a Program query.
+        """
+        from sqlalchemy.orm import selectinload
+
+        if program_loader is None:
+            requirements = selectinload(Program.requirements)
+        else:
+            requirements = program_loader.selectinload(Program.requirements)
+        return (
+            requirements.selectinload(ProgramRequirement.groups).selectinload(RequirementGroup.course_options),
+            requirements.selectinload(ProgramRequirement.constraints),
+        )
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_requirements=True):
+        data = {
             'id': self.id,
             'name': self.name,
             'degree_type': self.degree_type,
@@ -41,8 +62,10 @@ class Program(db.Model):
             'description': self.description,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'requirements': [req.to_dict() for req in self.requirements]
         }
+        if include_requirements:
+            data['requirements'] = [req.to_dict() for req in self.requirements]
+        return data
 
 class ProgramRequirement(db.Model):
     __tablename__ = 'program_requirements'
@@ -108,7 +131,7 @@ class ProgramRequirement(db.Model):
                 course for course in student_courses 
                 if course.requirement_category == self.category and course.status == 'completed'
             ]
-            total_credits = sum(course.credits or course.course.credits for course in matching_courses)
+            total_credits = sum(course.effective_credits for course in matching_courses)
             return {
                 'satisfied': total_credits >= self.credits_required,
                 'credits_earned': total_credits,
@@ -132,9 +155,9 @@ class ProgramRequirement(db.Model):
                 all_matching_courses.append(course)
         
         # Sort by credits (highest first) to maximize credit accumulation
-        all_matching_courses.sort(key=lambda c: c.credits or c.course.credits, reverse=True)
+        all_matching_courses.sort(key=lambda c: c.effective_credits, reverse=True)
         
-        total_credits = sum(c.credits or c.course.credits for c in all_matching_courses)
+        total_credits = sum(c.effective_credits for c in all_matching_courses)
         
         return {
             'satisfied': total_credits >= self.credits_required,
@@ -222,22 +245,26 @@ class RequirementGroup(db.Model):
                 'group_name': self.group_name
             }
 
-        option_codes = [opt.course_code for opt in self.course_options]
+        option_codes = {opt.course_code for opt in self.course_options}
         
+        # Resolve each course's credits once; they feed the bounds check,
+        # the sort and the totals below.
+        credits_by_course = {}
         matching_courses = []
         for course in student_courses:
-            if (course.status == 'completed' and 
-                course.course.code in option_codes and
-                self._meets_credit_requirements(course)):
-                matching_courses.append(course)
+            if course.status == 'completed' and course.course.code in option_codes:
+                course_credits = course.effective_credits
+                if self._meets_credit_requirements(course_credits):
+                    credits_by_course[id(course)] = course_credits
+                    matching_courses.append(course)
         
         
-        matching_courses.sort(key=lambda c: c.credits or c.course.credits, reverse=True)
+        matching_courses.sort(key=lambda c: credits_by_course[id(c)], reverse=True)
         
         if self.courses_required:
             
             courses_taken = len(matching_courses)
-            credits_earned = sum(c.credits or c.course.credits for c in matching_courses[:self.courses_required])
+            credits_earned = sum(credits_by_course[id(c)] for c in matching_courses[:self.courses_required])
             
             return {
                 'satisfied': courses_taken >= self.courses_required,
@@ -256,8 +283,7 @@ class RequirementGroup(db.Model):
             for course in matching_courses:
                 if total_credits >= self.credits_required:
                     break
-                course_credits = course.credits or course.course.credits
-                total_credits += course_credits
+                total_credits += credits_by_course[id(course)]
                 courses_used.append(course)
             
             return {
@@ -270,9 +296,7 @@ class RequirementGroup(db.Model):
         
         return {'satisfied': False, 'error': 'No completion criteria defined'}
     
-    def _meets_credit_requirements(self, course):
-        
-        course_credits = course.credits or course.course.credits
+    def _meets_credit_requirements(self, course_credits):
         
         if self.min_credits_per_course and course_credits < self.min_credits_per_course:
             return False
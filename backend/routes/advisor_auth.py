@@ -15,7 +15,6 @@ from auth import require_admin
 from datetime import datetime, timedelta
 import csv
 import io
-import secrets
 
 bp = Blueprint('advisor_auth', __name__, url_prefix='/api/advisor-auth')
 
@@ -125,9 +124,10 @@ def request_access_code():
     
     # Check if locked
     if advisor.is_locked():
+        locked_until = advisor.lock_expires_at()
         return jsonify({
             'error': 'Account temporarily locked due to too many failed attempts. Please try again later.',
-            'locked_until': advisor.locked_until.isoformat() if advisor.locked_until else None
+            'locked_until': locked_until.isoformat() if locked_until else None
         }), 403
     
     # Ensure TOTP secret exists and generate access code
@@ -192,18 +192,15 @@ def verify_access_code():
     
     # Check if locked
     if advisor.is_locked():
+        locked_until = advisor.lock_expires_at()
         return jsonify({
             'error': 'Account temporarily locked due to too many failed attempts.',
-            'locked_until': advisor.locked_until.isoformat() if advisor.locked_until else None
+            'locked_until': locked_until.isoformat() if locked_until else None
         }), 403
     
     # Try TOTP first
     if totp and advisor.verify_totp(totp):
-        advisor.session_token = secrets.token_urlsafe(48)
-        advisor.session_expires_at = datetime.utcnow() + timedelta(hours=1)
-        advisor.is_active = True
-        advisor.last_login = datetime.utcnow()
-        advisor.failed_attempts = 0
+        advisor.start_session()
         try:
             db.session.commit()
             
@@ -254,14 +251,15 @@ def verify_access_code():
     
     # Check if now locked
     if advisor.is_locked():
+        locked_until = advisor.lock_expires_at()
         return jsonify({
             'error': 'Too many failed attempts. Account locked temporarily.',
-            'locked_until': advisor.locked_until.isoformat()
+            'locked_until': locked_until.isoformat() if locked_until else None
         }), 403
     
     return jsonify({
         'error': 'Invalid or expired code/TOTP',
-        'attempts_remaining': max(0, 5 - advisor.failed_attempts)
+        'attempts_remaining': advisor.attempts_remaining()
     }), 401
 
 
@@ -563,12 +561,32 @@ def get_advisor_plans():
     # Get total count before pagination
     total_count = query.count()
     
-    # Apply pagination
-    plans = query.limit(limit).offset(offset).all()
+    # Apply pagination.  The list only shows a course count and program
+    # headers, so join the programs, leave plan courses unloaded, and count
+    # courses for the whole page in one grouped query.
+    from models import PlanCourse
+    from sqlalchemy import func
+    from sqlalchemy.orm import joinedload
+    plans = query.options(
+        joinedload(Plan.target_program),
+        joinedload(Plan.current_program),
+    ).limit(limit).offset(offset).all()
+    course_counts = dict(
+        db.session.query(PlanCourse.plan_id, func.count(PlanCourse.id))
+        .filter(PlanCourse.plan_id.in_([plan.id for plan in plans]))
+        .group_by(PlanCourse.plan_id)
+        .all()
+    ) if plans else {}
+    
+    plans_data = []
+    for plan in plans:
+        plan_data = plan.to_dict(include_courses=False)
+        plan_data['course_count'] = course_counts.get(plan.id, 0)
+        plans_data.append(plan_data)
     
     # Return results
     return jsonify({
-        'plans': [plan.to_dict() for plan in plans],
+        'plans': plans_data,
         'total_count': total_count,
         'limit': limit,
         'offset': offset,
@@ -12,10 +12,30 @@ from auth import require_admin
 from models import db, Course, Equivalency
 from sqlalchemy import or_
 import os
+import re
+from functools import lru_cache
 from hmac import compare_digest
 
 bp = Blueprint('courses', __name__, url_prefix='/api/courses')
 
+_NON_WORD_RE = re.compile(r'\W+')
+_ABBREVIATION_STOPWORDS = frozenset({
+    'of', 'the', 'and', 'for', 'in', 'on', 'at', 'by', 'to', 'with', 'without',
+    'from', 'into', 'onto', 'over', 'under', 'a', 'an',
+})
+
+
+@lru_cache(maxsize=256)
+def _institution_abbreviation(name: str) -> str:
+    """Initials of an institution name, skipping common prepositions.
+
+    Called once per course row when filtering by institution, over a small
+    set of distinct names, so results are memoised.
+    """
+    # Split on whitespace and punctuation
+    words = _NON_WORD_RE.split(name)
+    return ''.join(w[0].upper() for w in words if w and w.lower() not in _ABBREVIATION_STOPWORDS)
+
 def is_admin_request():
     """Check if the current request has a valid admin token."""
     token = os.environ.get('ADMIN_API_TOKEN')
@@ -80,20 +100,14 @@ def get_courses():
     # whose institution name contains the search term (case‑insensitive)
     # OR whose computed abbreviation matches the search term.  The
     # abbreviation is formed by taking the first letter of each word
-    # (excluding common prepositions) in the institution name.
-    def compute_abbreviation(name: str) -> str:
-        import re
-        preps = {'of', 'the', 'and', 'for', 'in', 'on', 'at', 'by', 'to', 'with', 'without', 'from', 'into', 'onto', 'over', 'under', 'a', 'an'}
-        # Split on whitespace and punctuation
-        words = re.split(r'\W+', name)
-        initials = [w[0] for w in words if w and w.lower() not in preps]
-        return ''.join(ch.upper() for ch in initials)
+    # (excluding common prepositions) in the institution name; see
+    # _institution_abbreviation.
 
     if inst_filter_value:
         # Prepare the search term for comparison.  A lowercase version is
         # used for substring matching and an uppercase version (with
         # whitespace removed) is used as an abbreviation candidate.  We do
-        # not run the search term through compute_abbreviation because
+        # not run the search term through _institution_abbreviation because
         # users entering an abbreviation (e.g. "UNO") already supply the
         # desired letters.
         inst_search_lower = inst_filter_value.lower()
@@ -107,9 +121,9 @@ def get_courses():
                 matching_courses.append(course)
                 continue
             # Otherwise compare computed abbreviation of the institution
-            course_abbrev = compute_abbreviation(inst_name)
+            course_abbrev = _institution_abbreviation(inst_name)
             # Normalise the course abbreviation by removing whitespace and
-            # punctuation (compute_abbreviation already removes punctuation)
+            # punctuation (_institution_abbreviation already removes punctuation)
             # and compare directly to the user‑supplied abbreviation.
             if course_abbrev == inst_search_abbrev:
                 matching_courses.append(course)
@@ -71,12 +71,12 @@ def get_plan_by_code(plan_code):
         return jsonify({'error': 'Invalid plan code format'}), 400
     
     # Sanitize input
-    clean_code = ''.join(c for c in plan_code.upper().strip() if c.isalnum())
+    clean_code = Plan.clean_plan_code(plan_code)
     if len(clean_code) != 8:
         return jsonify({'error': 'Invalid plan code characters'}), 400
     
     # Find plan
-    plan = Plan.find_by_code(clean_code)
+    plan = Plan.find_by_code(clean_code, *Plan.progress_load_options())
     
     if not plan:
         return jsonify({'error': 'Plan not found or access denied'}), 404
@@ -104,7 +104,7 @@ def verify_plan_code(plan_code):
         return jsonify({'valid': False, 'error': 'Invalid plan code format'}), 400
     
     # Sanitize input
-    clean_code = ''.join(c for c in plan_code.upper().strip() if c.isalnum())
+    clean_code = Plan.clean_plan_code(plan_code)
     if len(clean_code) != 8:
         return jsonify({'valid': False, 'error': 'Invalid plan code characters'}), 400
     
@@ -182,7 +182,7 @@ def create_plan():
             # plan_code will be auto-generated in __init__
         )
         
-        db.session.add(plan)
+        plan.insert_with_unique_code()
         db.session.commit()
         
         # Grant immediate access to the creator
@@ -211,12 +211,13 @@ def get_plan(plan_id):
     if not check_plan_access(plan_id):
         return jsonify({'error': 'Access denied. Use plan code to access this plan.'}), 403
     
-    plan = Plan.query.get_or_404(plan_id)
+    plan = Plan.query.options(*Plan.progress_load_options()).get_or_404(plan_id)
     
     plan_data = plan.to_dict()
-    plan_data['progress'] = plan.calculate_progress()
-    plan_data['unmet_requirements'] = plan.get_unmet_requirements()
-    plan_data['course_suggestions'] = plan.suggest_courses_for_requirements()
+    svc = ProgressService(plan)
+    plan_data['progress'] = svc.full_progress()
+    plan_data['unmet_requirements'] = svc.unmet()
+    plan_data['course_suggestions'] = svc.suggestions()
     
     return jsonify(plan_data)
 
@@ -284,7 +285,7 @@ def delete_plan_by_code(plan_code):
     if not plan_code or len(plan_code.strip()) != 8:
         return jsonify({'error': 'Invalid plan code format'}), 400
     
-    clean_code = ''.join(c for c in plan_code.upper().strip() if c.isalnum())
+    clean_code = Plan.clean_plan_code(plan_code)
     plan = Plan.find_by_code(clean_code)
     
     if not plan:
@@ -357,7 +358,7 @@ def add_course_to_plan_by_code(plan_code):
     if not plan_code or len(plan_code.strip()) != 8:
         return jsonify({'error': 'Invalid plan code format'}), 400
     
-    clean_code = ''.join(c for c in plan_code.upper().strip() if c.isalnum())
+    clean_code = Plan.clean_plan_code(plan_code)
     plan = Plan.find_by_code(clean_code)
     
     if not plan:
@@ -445,7 +446,7 @@ def validate_course_constraints_by_code(plan_code):
     if not plan_code or len(plan_code.strip()) != 8:
         return jsonify({'error': 'Invalid plan code format'}), 400
     
-    clean_code = ''.join(c for c in plan_code.upper().strip() if c.isalnum())
+    clean_code = Plan.clean_plan_code(plan_code)
     plan = Plan.find_by_code(clean_code)
     
     if not plan:
@@ -546,9 +547,10 @@ def get_degree_audit(plan_id):
     if not check_plan_access(plan_id):
         return jsonify({'error': 'Access denied. Use plan code to access this plan.'}), 403
 
-    plan = Plan.query.get_or_404(plan_id)
+    plan = Plan.query.options(*Plan.progress_load_options()).get_or_404(plan_id)
     svc = ProgressService(plan)
-    full = svc.full_progress()
+    # Only requirement totals are summarised below
+    full = svc.full_progress(include_course_details=False)
 
     # The frontend expects a flattened summary, not the nested { current, transfer } shape.
     # Prefer the target/transfer program; fall back to current if transfer missing.
@@ -558,23 +560,31 @@ def get_degree_audit(plan_id):
 
     reqs = chosen.get('requirements') or []
     requirement_progress = []
+    # Accumulate the summary totals while building the rows instead of
+    # re-scanning requirement_progress once per total.
+    total_credits_required = 0
+    total_credits_earned = 0
+    requirements_complete = 0
     for r in reqs:
         total = int(r.get('totalCredits') or 0)
         completed = int(r.get('completedCredits') or 0)
+        credits_completed = min(completed, total) if total else completed
+        is_complete = (r.get('status') == 'met')
         requirement_progress.append({
             'id': r.get('id'),
             'category': r.get('category') or r.get('name') or '',
             'credits_required': total,
-            'credits_completed': min(completed, total) if total else completed,
+            'credits_completed': credits_completed,
             'credits_remaining': max(0, (total or 0) - (completed or 0)),
-            'is_complete': (r.get('status') == 'met')
+            'is_complete': is_complete
         })
+        total_credits_required += total
+        total_credits_earned += credits_completed
+        requirements_complete += is_complete
 
-    total_credits_required = sum(x.get('credits_required', 0) for x in requirement_progress)
-    total_credits_earned = sum(x.get('credits_completed', 0) for x in requirement_progress)
     completion_percentage = (total_credits_earned / total_credits_required * 100) if total_credits_required else 0.0
     requirements_completion_percentage = (
-        (sum(1 for x in requirement_progress if x.get('is_complete')) / len(requirement_progress) * 100)
+        (requirements_complete / len(requirement_progress) * 100)
         if requirement_progress else 0.0
     )
 
@@ -614,9 +624,9 @@ def download_degree_audit(plan_id):
     if fmt != 'csv':
         return jsonify({'error': 'Unsupported format'}), 400
 
-    plan = Plan.query.get_or_404(plan_id)
+    plan = Plan.query.options(*Plan.progress_load_options()).get_or_404(plan_id)
     svc = ProgressService(plan)
-    progress = svc.full_progress()
+    progress = svc.full_progress(include_course_details=False)
     
     # Handle both current and transfer progress
     current_requirements = progress.get('current', {}).get('requirements', [])
@@ -675,7 +685,7 @@ def get_plan_progress(plan_id):
     if not check_plan_access(plan_id):
         return jsonify({'error': 'Access denied. Use plan code to access this plan.'}), 403
     
-    plan = Plan.query.get_or_404(plan_id)
+    plan = Plan.query.options(*Plan.progress_load_options()).get_or_404(plan_id)
     view_filter = request.args.get('view', 'All Courses')
     svc = ProgressService(plan)
     full = svc.full_progress(view_filter=view_filter)
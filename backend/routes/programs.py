@@ -32,7 +32,7 @@ def get_programs():
             year_filter_int = int(year_filter)
         except ValueError:
             year_filter_int = None
-    programs = Program.query.all()
+    programs = Program.query.options(*Program.requirement_tree_options()).all()
     result = []
     for program in programs:
         prog_data = program.to_dict()
@@ -75,7 +75,7 @@ def get_program(program_id):
             year_filter_int = int(year_filter)
         except ValueError:
             year_filter_int = None
-    program = Program.query.get_or_404(program_id)
+    program = Program.query.options(*Program.requirement_tree_options()).get_or_404(program_id)
     program_data = program.to_dict()
     requirements_analysis = []
     for requirement in program.requirements:
@@ -298,7 +298,6 @@ def bulk_update_requirements(program_id):
     Supports updating constraints along with groups and options.
     """
     from models.constraint import RequirementConstraint
-    import json
     
     data = request.get_json() or {}
     semester = data.get('semester')
@@ -365,8 +364,8 @@ def bulk_update_requirements(program_id):
                         new_constraint = RequirementConstraint(
                             requirement_id=requirement.id,
                             constraint_type=constraint_data.get('constraint_type', 'credits'),
-                            params=json.dumps(constraint_data.get('params', {})),
-                            scope_filter=json.dumps(constraint_data.get('scope_filter', {})) if constraint_data.get('scope_filter') else None,
+                            params=constraint_data.get('params') or {},
+                            scope_filter=constraint_data.get('scope_filter') or None,
                             description=constraint_data.get('description'),
                             priority=int(constraint_data.get('priority', 0))
                         )
@@ -383,9 +382,9 @@ def bulk_update_requirements(program_id):
                             if 'constraint_type' in constraint_data:
                                 constraint.constraint_type = constraint_data['constraint_type']
                             if 'params' in constraint_data:
-                                constraint.params = json.dumps(constraint_data['params'])
+                                constraint.params = constraint_data['params'] or {}
                             if 'scope_filter' in constraint_data:
-                                constraint.scope_filter = json.dumps(constraint_data['scope_filter']) if constraint_data['scope_filter'] else None
+                                constraint.scope_filter = constraint_data['scope_filter'] or None
                             if 'description' in constraint_data:
                                 constraint.description = constraint_data['description']
                             if 'priority' in constraint_data:
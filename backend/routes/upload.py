@@ -123,6 +123,10 @@ def upload_courses():
         courses_created = 0
         courses_updated = 0
         errors = []
+        # New courses are collected and inserted in one batch at the end;
+        # keyed by the normalised composite key so repeated CSV rows update
+        # the pending entry instead of colliding on insert.
+        new_courses = {}
         
         for row_num, row in enumerate(csv_reader, start=2):
             try:
@@ -166,6 +170,23 @@ def upload_courses():
                     if course_type:
                         existing_course.course_type = course_type
                     
+                    courses_updated += 1
+                elif (subj, num, inst.lower()) in new_courses:
+                    pending = new_courses[(subj, num, inst.lower())]
+                    pending['title'] = title
+                    pending['description'] = row.get('description', '').strip()
+                    pending['credits'] = int(row.get('credits', 0))
+                    pending['department'] = row.get('department', '').strip()
+                    pending['prerequisites'] = row.get('prerequisites', '').strip()
+                    
+                    has_lab_str = row.get('has_lab', '').strip().lower()
+                    if has_lab_str in ['true', 'false']:
+                        pending['has_lab'] = (has_lab_str == 'true')
+                    
+                    course_type = row.get('course_type', '').strip()
+                    if course_type:
+                        pending['course_type'] = course_type
+                    
                     courses_updated += 1
                 else:
                     
@@ -197,7 +218,19 @@ def upload_courses():
                         errors.append(f"Row {row_num}: {', '.join(validation_errors)}")
                         continue
                     
-                    db.session.add(course)
+                    new_courses[(subj, num, inst.lower())] = {
+                        'code': course.code,
+                        'subject_code': course.subject_code,
+                        'course_number': course.course_number,
+                        'title': course.title,
+                        'description': course.description,
+                        'credits': course.credits,
+                        'institution': course.institution,
+                        'department': course.department,
+                        'prerequisites': course.prerequisites,
+                        'has_lab': course.has_lab,
+                        'course_type': course.course_type
+                    }
                     courses_created += 1
                     
             except ValueError as e:
@@ -205,6 +238,8 @@ def upload_courses():
             except Exception as e:
                 errors.append(f"Row {row_num}: {str(e)}")
         
+        Course.bulk_import(new_courses.values())
+        
         if courses_created > 0 or courses_updated > 0:
             db.session.commit()
         
@@ -342,6 +377,10 @@ def upload_equivalencies():
         equivalencies_created = 0
         equivalencies_updated = 0
         errors = []
+        # New equivalencies are inserted in one batch at the end, keyed by
+        # (from_course_id, to_course_id) so a repeated CSV row updates the
+        # pending entry instead of violating unique_equivalency.
+        new_equivalencies = {}
         
         for row_num, row in enumerate(csv_reader, start=2):
             try:
@@ -395,6 +434,18 @@ def upload_equivalencies():
                     continue
                 
                 
+                key = (from_course.id, to_course.id)
+                values = {
+                    'equivalency_type': row.get('equivalency_type', 'direct').strip(),
+                    'notes': row.get('notes', '').strip(),
+                    'approved_by': row.get('approved_by', '').strip()
+                }
+                
+                if key in new_equivalencies:
+                    new_equivalencies[key].update(values)
+                    equivalencies_updated += 1
+                    continue
+                
                 existing_equiv = Equivalency.query.filter_by(
                     from_course_id=from_course.id,
                     to_course_id=to_course.id
@@ -402,26 +453,20 @@ def upload_equivalencies():
                 
                 if existing_equiv:
                     
-                    existing_equiv.equivalency_type = row.get('equivalency_type', 'direct').strip()
-                    existing_equiv.notes = row.get('notes', '').strip()
-                    existing_equiv.approved_by = row.get('approved_by', '').strip()
+                    existing_equiv.equivalency_type = values['equivalency_type']
+                    existing_equiv.notes = values['notes']
+                    existing_equiv.approved_by = values['approved_by']
                     equivalencies_updated += 1
                 else:
                     
-                    equivalency = Equivalency(
-                        from_course_id=from_course.id,
-                        to_course_id=to_course.id,
-                        equivalency_type=row.get('equivalency_type', 'direct').strip(),
-                        notes=row.get('notes', '').strip(),
-                        approved_by=row.get('approved_by', '').strip()
-                    )
-                    
-                    db.session.add(equivalency)
+                    new_equivalencies[key] = dict(values, from_course_id=from_course.id, to_course_id=to_course.id)
                     equivalencies_created += 1
                     
             except Exception as e:
                 errors.append(f"Row {row_num}: {str(e)}")
         
+        Equivalency.bulk_import(new_equivalencies.values())
+        
         if equivalencies_created > 0 or equivalencies_updated > 0:
             db.session.commit()
         
@@ -991,7 +1036,6 @@ def upload_requirements():
 
         # FOURTH PASS: Create RequirementConstraint records from category_constraints
         from models.constraint import RequirementConstraint
-        import json
         constraints_created = 0
         
         for constraint_key, constraint_data in category_constraints.items():
@@ -1025,8 +1069,8 @@ def upload_requirements():
                 constraint = RequirementConstraint(
                     requirement_id=requirement.id,
                     constraint_type='credits',
-                    params=json.dumps(params),
-                    scope_filter=json.dumps(scope_filter) if scope_filter else None,
+                    params=params,
+                    scope_filter=scope_filter or None,
                     description=constraint_data.get('description', '')
                 )
                 db.session.add(constraint)
@@ -1044,8 +1088,8 @@ def upload_requirements():
                 constraint = RequirementConstraint(
                     requirement_id=requirement.id,
                     constraint_type='courses',
-                    params=json.dumps(params),
-                    scope_filter=json.dumps(scope_filter) if scope_filter else None,
+                    params=params,
+                    scope_filter=scope_filter or None,
                     description=constraint_data.get('description', '')
                 )
                 db.session.add(constraint)
@@ -1061,8 +1105,8 @@ def upload_requirements():
                 constraint = RequirementConstraint(
                     requirement_id=requirement.id,
                     constraint_type='min_courses_at_level',
-                    params=json.dumps(params),
-                    scope_filter=json.dumps(scope_filter) if scope_filter else None,
+                    params=params,
+                    scope_filter=scope_filter or None,
                     description=constraint_data.get('description', '')
                 )
                 db.session.add(constraint)
@@ -1091,8 +1135,8 @@ def upload_requirements():
                 constraint = RequirementConstraint(
                     requirement_id=requirement.id,
                     constraint_type=actual_constraint_type,
-                    params=json.dumps(params),
-                    scope_filter=json.dumps(tag_scope_filter) if tag_scope_filter else None,
+                    params=params,
+                    scope_filter=tag_scope_filter or None,
                     description=constraint_data.get('description', '')
                 )
                 db.session.add(constraint)
@@ -20,8 +20,35 @@ from models import db
 from models.course import Course
 from models.equivalency import Equivalency
 from models.plan import PlanCourse
+from functools import lru_cache
 import re
 
+# Delimiters between prerequisites: comma, semicolon, "and", "or"
+_PREREQ_SPLIT_RE = re.compile(r'[,;]|\s+and\s+|\s+or\s+', re.IGNORECASE)
+# Course code forms like "MATH101", "MATH 101", "MATH-101"
+_PREREQ_CODE_RE = re.compile(r'^([A-Za-z]+)[\s-]*(\d+[A-Za-z]*)$')
+
+
+@lru_cache(maxsize=1024)
+def _parse_prerequisite_codes(prerequisites_str):
+    """Cached worker for PrerequisiteService.parse_prerequisites; returns a tuple."""
+    if not prerequisites_str or not prerequisites_str.strip():
+        return ()
+    
+    # For now, treat all prerequisites as required (AND logic)
+    course_codes = []
+    for part in _PREREQ_SPLIT_RE.split(prerequisites_str):
+        part = part.strip()
+        if not part:
+            continue
+        
+        # Normalize course code format
+        match = _PREREQ_CODE_RE.match(part)
+        if match:
+            course_codes.append(f"{match.group(1).upper()} {match.group(2).upper()}")
+    
+    return tuple(course_codes)
+
 
 class PrerequisiteService:
     """Service for validating course prerequisites with equivalency support."""
@@ -40,29 +67,9 @@ class PrerequisiteService:
         Returns:
             List of normalized course codes (e.g., ['MATH 101', 'BIOL 200'])
         """
-        if not prerequisites_str or not prerequisites_str.strip():
-            return []
-        
-        # Split by common delimiters: comma, semicolon, "and", "or"
-        # For now, treat all prerequisites as required (AND logic)
-        parts = re.split(r'[,;]|\s+and\s+|\s+or\s+', prerequisites_str, flags=re.IGNORECASE)
-        
-        course_codes = []
-        for part in parts:
-            part = part.strip()
-            if not part:
-                continue
-            
-            # Normalize course code format
-            # Handle formats like "MATH101", "MATH 101", "MATH-101"
-            match = re.match(r'^([A-Za-z]+)[\s-]*(\d+[A-Za-z]*)$', part)
-            if match:
-                subject = match.group(1).upper()
-                number = match.group(2).upper()
-                normalized = f"{subject} {number}"
-                course_codes.append(normalized)
-        
-        return course_codes
+        # Parsing is memoised per distinct string; return a fresh list so
+        # callers can't mutate the cached value.
+        return list(_parse_prerequisite_codes(prerequisites_str))
     
     @staticmethod
     def get_equivalent_courses(course_code, institution=None):
@@ -154,7 +161,8 @@ class PrerequisiteService:
     def check_prerequisite_satisfied(
         prerequisite_code,
         completed_courses,
-        institution=None
+        institution=None,
+        completed_codes=None
     ):
         """
         Check if a prerequisite is satisfied by completed courses.
@@ -167,21 +175,28 @@ class PrerequisiteService:
             prerequisite_code: Required prerequisite course code
             completed_courses: List of PlanCourse objects with status='completed'
             institution: Optional institution filter
+            completed_codes: Optional precomputed set of completed course
+                codes; callers checking several prerequisites pass it to
+                avoid rebuilding it each time
             
         Returns:
             True if prerequisite is satisfied, False otherwise
         """
+        if completed_codes is None:
+            completed_codes = PrerequisiteService._completed_codes(completed_courses)
+        
         # Get all courses equivalent to the prerequisite
         equivalent_codes = PrerequisiteService.get_all_transitive_equivalents(
             prerequisite_code, institution
         )
         
         # Check if student has completed any equivalent course
-        for plan_course in completed_courses:
-            if plan_course.course and plan_course.course.code in equivalent_codes:
-                return True
-        
-        return False
+        return not completed_codes.isdisjoint(equivalent_codes)
+    
+    @staticmethod
+    def _completed_codes(completed_courses):
+        """Set of course codes for the given completed PlanCourse objects."""
+        return {pc.course.code for pc in completed_courses if pc.course}
     
     @staticmethod
     def validate_prerequisites(
@@ -239,10 +254,11 @@ class PrerequisiteService:
         # Check each prerequisite
         satisfied = []
         missing = []
+        completed_codes = PrerequisiteService._completed_codes(completed_courses)
         
         for prereq_code in prerequisite_codes:
             if PrerequisiteService.check_prerequisite_satisfied(
-                prereq_code, completed_courses, institution
+                prereq_code, completed_courses, institution, completed_codes=completed_codes
             ):
                 satisfied.append(prereq_code)
             else:
@@ -22,6 +22,13 @@ from models.plan import Plan
 class ProgressService:
     """Facade for plan progress calculation.
 
+    Results are memoised for the lifetime of the service.  A service is
+    built per request, so repeated calls within one response (e.g. unmet
+    requirements feeding suggestions) are computed once without risking
+    staleness across requests.  Nothing is shared between requests: an
+    audit always reflects the current plan, requirement tree and
+    equivalencies.
+
     Future improvements:
       * Inject repositories to batch-load requirements & courses
       * Cache normalization of categories
@@ -29,12 +36,30 @@ class ProgressService:
     """
     def __init__(self, plan: Plan):
         self.plan = plan
+        self._progress: Dict[tuple, Dict[str, Any]] = {}
+        self._unmet: Optional[list] = None
+
+    def full_progress(self, view_filter: str = "All Courses",
+                      include_course_details: bool = True) -> Dict[str, Any]:
+        """Return combined current + transfer progress safely.
 
-    def full_progress(self, view_filter: str = "All Courses") -> Dict[str, Any]:
-        """Return combined current + transfer progress safely."""
-        return self.plan.calculate_progress(program=None, view_filter=view_filter)
+        Pass ``include_course_details=False`` when only requirement totals
+        are rendered; an already computed detailed result is reused.
+        """
+        detailed = self._progress.get((view_filter, True))
+        if detailed is not None:
+            return detailed
+        key = (view_filter, include_course_details)
+        if key not in self._progress:
+            self._progress[key] = self.plan.calculate_progress(
+                program=None, view_filter=view_filter,
+                include_course_details=include_course_details)
+        return self._progress[key]
 
     def program_progress(self, target: str, view_filter: str = "All Courses") -> Dict[str, Any]:
+        full = self._progress.get((view_filter, True))
+        if full is not None and target in ('current', 'transfer'):
+            return full[target]
         if target == 'current' and self.plan.current_program:
             return self.plan.calculate_progress(self.plan.current_program, view_filter)
         if target == 'transfer' and self.plan.target_program:
@@ -47,7 +72,9 @@ class ProgressService:
         }
 
     def unmet(self):
-        return self.plan.get_unmet_requirements()
+        if self._unmet is None:
+            self._unmet = self.plan.get_unmet_requirements()
+        return self._unmet
 
     def suggestions(self):
-        return self.plan.suggest_courses_for_requirements()
+        return self.plan.suggest_courses_for_requirements(unmet_requirements=self.unmet())
@@ -106,7 +106,7 @@ def test_credits_constraint_basic(app, client):
         constraint = RequirementConstraint.query.filter_by(requirement_id=requirement.id).first()
         
         assert constraint.constraint_type == 'credits'
-        params = json.loads(constraint.params)
+        params = constraint.params
         assert params['credits_min'] == 10
         assert 'credits_max' not in params
 
@@ -128,7 +128,7 @@ def test_credits_constraint_range(app, client):
         requirement = ProgramRequirement.query.filter_by(category="Electives").first()
         constraint = RequirementConstraint.query.filter_by(requirement_id=requirement.id).first()
         
-        params = json.loads(constraint.params)
+        params = constraint.params
         assert params['credits_min'] == 10
         assert params['credits_max'] == 15
 
@@ -151,7 +151,7 @@ def test_courses_constraint_basic(app, client):
         constraint = RequirementConstraint.query.filter_by(requirement_id=requirement.id).first()
         
         assert constraint.constraint_type == 'courses'
-        params = json.loads(constraint.params)
+        params = constraint.params
         assert params['courses_min'] == 2
         assert params['courses_max'] == 4
 
@@ -174,7 +174,7 @@ def test_level_constraint(app, client):
         constraint = RequirementConstraint.query.filter_by(requirement_id=requirement.id).first()
         
         assert constraint.constraint_type == 'min_courses_at_level'
-        params = json.loads(constraint.params)
+        params = constraint.params
         assert params['level'] == 3000
         assert params['courses'] == 2
 
@@ -197,12 +197,12 @@ def test_tag_constraint(app, client):
         constraint = RequirementConstraint.query.filter_by(requirement_id=requirement.id).first()
         
         assert constraint.constraint_type == 'min_tag_courses'
-        params = json.loads(constraint.params)
+        params = constraint.params
         assert params['tag'] == 'true'
         assert params['courses'] == 2
         
         # Check scope filter includes tag field
-        scope = json.loads(constraint.scope_filter)
+        scope = constraint.scope_filter
         assert scope['tag_field'] == 'has_lab'
 
 
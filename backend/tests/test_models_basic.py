@@ -7,12 +7,17 @@ This file is part of Degree Link.
 Licensed under the MIT License. See LICENSE file in the project root.
 """
 
+import itertools
+from datetime import datetime, timedelta
+
 import pytest
 from models import init_app, db
 from models.course import Course
-from models.plan import Plan
+from models.plan import Plan, PlanCourse
+from models.program import Program
 from flask import Flask
 
+
 @pytest.fixture(scope="module")
 def app():
     app = Flask(__name__)
@@ -23,12 +28,34 @@ def app():
         db.create_all()
     yield app
 
+
 @pytest.fixture()
 def session(app):
     with app.app_context():
         yield db.session
         db.session.rollback()
 
+
+_stale_plan_ids = itertools.count(1)
+
+
+@pytest.fixture()
+def stale_plan(session):
+    """A committed plan and an unused course, with updated_at a day old."""
+    n = next(_stale_plan_ids)
+    prog = Program(name=f'BS Stale {n}', degree_type='BS', institution='TestU', total_credits_required=120)
+    course = Course(code=f'HIST {1000 + n}', title=f'History {n}', credits=3, institution='TestU')
+    session.add_all([prog, course])
+    session.commit()
+    plan = Plan(student_name='S', plan_name='P', program_id=prog.id)
+    session.add(plan)
+    session.commit()
+    stale = datetime.utcnow() - timedelta(days=1)
+    plan.updated_at = stale
+    session.commit()
+    return plan, course, stale
+
+
 def test_course_normalization(session):
     c = Course(code='BiOl104', title='Intro Biology', credits=3, institution='TestU', department='Biology')
     session.add(c)
@@ -37,6 +64,7 @@ def test_course_normalization(session):
     assert c.course_number == '104'
     assert c.code == 'BIOL 104'
 
+
 def test_plan_code_uniqueness(session):
     p1 = Plan(student_name='A', student_email='a@example.com', program_id=1, plan_name='Plan A')
     p2 = Plan(student_name='B', student_email='b@example.com', program_id=1, plan_name='Plan B')
@@ -45,3 +73,171 @@ def test_plan_code_uniqueness(session):
     assert p1.plan_code != p2.plan_code
     assert len(p1.plan_code) == 8
     assert len(p2.plan_code) == 8
+
+
+def test_course_bulk_import_normalization(session):
+    inserted = Course.bulk_import([
+        {'code': 'chem-1010', 'title': 'General Chemistry', 'credits': 3, 'institution': 'BulkU'},
+        {'subject_code': 'PHYS', 'course_number': '2001L', 'title': 'Physics Lab', 'credits': 1, 'institution': 'BulkU'},
+    ])
+    session.commit()
+    assert inserted == 2
+    chem = Course.query.filter_by(institution='BulkU', subject_code='CHEM').one()
+    assert chem.code == 'CHEM 1010'
+    assert chem.course_number_numeric == 1010
+    assert chem.course_level == 1000
+    phys = Course.query.filter_by(institution='BulkU', subject_code='PHYS').one()
+    assert phys.code == 'PHYS 2001L'
+    assert phys.course_level == 2000
+
+
+def test_course_prerequisite_codes():
+    c = Course(code='MATH 2107', title='Calc II', credits=4, institution='TestU',
+               prerequisites='MATH 1115, , MATH 2106 ')
+    assert c.prerequisite_codes == ('MATH 1115', 'MATH 2106')
+    c.prerequisites = None
+    assert c.prerequisite_codes == ()
+
+
+def test_course_update_skips_sync_when_code_unchanged(session, monkeypatch):
+    c = Course(code='ENGL 1157', title='Composition', credits=3, institution='TestU')
+    session.add(c)
+    session.commit()
+    session.expire_all()
+    loaded = session.get(Course, c.id)
+    calls = []
+    original = Course._composite_fields.__func__
+    monkeypatch.setattr(Course, '_composite_fields',
+                        classmethod(lambda cls, *a: calls.append(a) or original(cls, *a)))
+    loaded.title = 'English Composition'
+    session.commit()
+    assert calls == []
+    loaded.course_number = '1158'
+    session.commit()
+    assert len(calls) == 1
+    assert loaded.code == 'ENGL 1158'
+
+
+def test_plan_updated_at_bumped_by_course_change(session, stale_plan):
+    plan, course, stale = stale_plan
+    session.add(PlanCourse(plan_id=plan.id, course_id=course.id, status='planned'))
+    session.commit()
+    assert plan.updated_at > stale
+
+
+def test_plan_updated_at_bumped_by_course_removal(session, stale_plan):
+    plan, course, stale = stale_plan
+    plan.courses.append(PlanCourse(course_id=course.id, status='planned'))
+    session.commit()
+    plan.updated_at = stale
+    session.commit()
+    # delete-orphan path: removing from the collection deletes the row
+    plan.courses.remove(plan.courses[0])
+    session.commit()
+    assert plan.courses == []
+    assert plan.updated_at > stale
+
+
+def test_plan_updated_at_bumped_for_plan_outside_session(session, stale_plan):
+    plan, course, stale = stale_plan
+    plan_id = plan.id
+    session.expunge(plan)
+    # The plan is not in the session, so it is bumped with an UPDATE by id
+    session.add(PlanCourse(plan_id=plan_id, course_id=course.id, status='planned'))
+    session.commit()
+    assert session.get(Plan, plan_id).updated_at > stale
+
+
+class _FakeRedis:
+    """Minimal in-memory stand-in for the redis calls AdvisorAuth makes."""
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def setex(self, key, seconds, value):
+        self.values[key] = value
+        self.ttls[key] = seconds
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def ttl(self, key):
+        return self.ttls.get(key, -2) if key in self.values else -2
+
+    def delete(self, key):
+        self.values.pop(key, None)
+        self.ttls.pop(key, None)
+
+
+def test_advisor_lockout_uses_redis_counter_and_lock(monkeypatch):
+    from models import advisor_auth
+    from models.advisor_auth import AdvisorAuth, MAX_FAILED_ATTEMPTS, LOCKOUT_DURATION
+    fake = _FakeRedis()
+    monkeypatch.setattr(advisor_auth, '_get_redis', lambda: fake)
+    # An old DB lock that has already run out must not leak into the response
+    stale_lock = datetime.utcnow() - timedelta(hours=1)
+    advisor = AdvisorAuth(email='lock@test.edu', failed_attempts=0, locked_until=stale_lock)
+    assert advisor.lock_expires_at() is None
+
+    for _ in range(MAX_FAILED_ATTEMPTS - 1):
+        advisor._record_failed_attempt()
+    assert advisor.attempts_remaining() == 1
+    assert not fake.exists(advisor_auth._lock_key(advisor.email))
+
+    advisor._record_failed_attempt()
+    # Counter and lock live in Redis; the advisor row is untouched
+    assert advisor.failed_attempts == 0
+    assert advisor.locked_until == stale_lock
+    assert advisor.attempts_remaining() == 0
+    assert advisor.is_locked()
+    expires = advisor.lock_expires_at()
+    assert expires > datetime.utcnow() + LOCKOUT_DURATION - timedelta(minutes=1)
+    data = advisor.to_dict()
+    assert data['is_locked'] is True
+    assert datetime.fromisoformat(data['locked_until']) > datetime.utcnow()
+
+    advisor._reset_failed_attempts()
+    assert advisor.attempts_remaining() == MAX_FAILED_ATTEMPTS
+
+    # Without a Redis lock a still-running DB lock is reported as before
+    fake.delete(advisor_auth._lock_key(advisor.email))
+    advisor.locked_until = datetime.utcnow() + timedelta(minutes=5)
+    assert advisor.lock_expires_at() == advisor.locked_until
+
+
+def test_insert_with_unique_code_retries_on_collision(session, monkeypatch):
+    existing = Plan(student_name='A', program_id=1, plan_name='Existing')
+    session.add(existing)
+    session.commit()
+    fresh_codes = iter(['RETRY234'])
+    monkeypatch.setattr(Plan, 'generate_unique_plan_code', staticmethod(lambda: next(fresh_codes)))
+    plan = Plan(student_name='B', program_id=1, plan_name='Collides', plan_code=existing.plan_code)
+    plan.insert_with_unique_code()
+    session.commit()
+    assert plan.id is not None
+    assert plan.plan_code == 'RETRY234'
+
+
+def test_insert_with_unique_code_gives_up_after_max_attempts(session, monkeypatch):
+    existing = Plan(student_name='A', program_id=1, plan_name='Existing')
+    session.add(existing)
+    session.commit()
+    calls = []
+    def same_code():
+        calls.append(1)
+        return existing.plan_code
+    monkeypatch.setattr(Plan, 'generate_unique_plan_code', staticmethod(same_code))
+    plan = Plan(student_name='B', program_id=1, plan_name='Always collides', plan_code=existing.plan_code)
+    with pytest.raises(Exception, match='Unable to generate unique plan code'):
+        plan.insert_with_unique_code(max_attempts=3)
+    assert len(calls) == 3
@@ -327,7 +327,7 @@ const AdvisorCenter = ({ onOpenPlan }) => {
                     {plan.target_program && (
                       <span>Program: {plan.target_program.name}</span>
                     )}
-                    <span>Courses: {plan.courses?.length || 0}</span>
+                    <span>Courses: {plan.course_count ?? plan.courses?.length ?? 0}</span>
                   </div>
                   <div className="flex gap-4">
                     <span>Created: {formatDate(plan.created_at)}</span>